@@ -0,0 +1,131 @@
+import json
+import random
+import sys
+
+from array import array
+from collections import Counter
+
+import degrees
+
+# Sources explored together by one bit-parallel BFS
+BATCH = 64
+
+
+def component_summary(graph):
+    """
+    Returns the number of connected components, the largest one's size
+    and a histogram of component sizes.
+    """
+    _, sizes = graph.components()
+    return {
+        "count": len(sizes),
+        "largest": max(sizes, default=0),
+        "sizes": histogram(sizes)
+    }
+
+
+def eccentricities(graph, sources):
+    """
+    Returns {person index: eccentricity} for each source, the greatest
+    degrees of separation from it to anyone in its component.
+
+    Runs one bit-parallel BFS per batch of up to BATCH sources: each
+    person holds an int bitmask of the sources that have reached it,
+    so a whole batch advances with one pass over the graph per layer.
+    """
+    result = {}
+    for start in range(0, len(sources), BATCH):
+        batch = sources[start:start + BATCH]
+        seen = [0] * len(graph.person_ids)
+        frontier = {}
+        for bit, source in enumerate(batch):
+            seen[source] |= 1 << bit
+            frontier[source] = frontier.get(source, 0) | 1 << bit
+        last = [0] * len(batch)
+        depth = 0
+        while frontier:
+            depth += 1
+
+            # Movies collect the bits of the frontier people in them
+            movie_bits = {}
+            for person, bits in frontier.items():
+                for movie in graph.movies_for(person):
+                    movie_bits[movie] = movie_bits.get(movie, 0) | bits
+
+            next_frontier = {}
+            for movie, bits in movie_bits.items():
+                for person in graph.stars_for(movie):
+                    new = bits & ~seen[person]
+                    if new:
+                        seen[person] |= new
+                        next_frontier[person] = next_frontier.get(person, 0) | new
+
+            reached = 0
+            for bits in next_frontier.values():
+                reached |= bits
+            for bit in range(len(batch)):
+                if reached >> bit & 1:
+                    last[bit] = depth
+            frontier = next_frontier
+
+        for bit, source in enumerate(batch):
+            result[source] = last[bit]
+    return result
+
+
+def degree_histograms(graph):
+    """
+    Returns histograms of the number of movies per person and of the
+    number of distinct co-stars per person.
+    """
+    movie_counts = array("i", (len(graph.movies_for(person))
+                               for person in range(len(graph.person_ids))))
+    costar_counts = array("i")
+    for person in range(len(graph.person_ids)):
+        costars = set()
+        for movie in graph.movies_for(person):
+            costars.update(graph.stars_for(movie))
+        costars.discard(person)
+        costar_counts.append(len(costars))
+    return histogram(movie_counts), histogram(costar_counts)
+
+
+def histogram(values):
+    """
+    Returns {value: count} sorted by value.
+    """
+    return dict(sorted(Counter(values).items()))
+
+
+def analyze(graph, samples=BATCH, seed=0):
+    """
+    Runs every analysis, sampling `samples` people for eccentricity.
+    """
+    people = [person for person in range(len(graph.person_ids)) if len(graph.movies_for(person))]
+    sources = random.Random(seed).sample(people, min(samples, len(people)))
+    movie_counts, costar_counts = degree_histograms(graph)
+    return {
+        "people": len(graph.person_ids),
+        "movies": len(graph.movie_ids),
+        "components": component_summary(graph),
+        "eccentricity": {graph.person_ids[person]: value
+                         for person, value in sorted(eccentricities(graph, sources).items())},
+        "movies_per_person": movie_counts,
+        "costars_per_person": costar_counts
+    }
+
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        sys.exit("Usage: python analytics.py directory output.json [samples]")
+    samples = int(sys.argv[3]) if len(sys.argv) == 4 else BATCH
+
+    degrees.load_data(sys.argv[1])
+    results = analyze(degrees.graph, samples)
+    with open(sys.argv[2], "w", encoding="utf-8") as f:
+        json.dump(results, f, separators=(",", ":"))
+    print(f"Wrote {sys.argv[2]}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import json
+import sys
+
+import degrees
+import parallel
+
+
+def read_pairs(filename):
+    """
+    Reads one tab-separated `source<TAB>target` pair per line, where each
+    side is an IMDB person id or a name. Blank lines are skipped.
+
+    Returns a list of (line number, source, target) tuples.
+    """
+    pairs = []
+    with open(filename, encoding="utf-8") as f:
+        for number, line in enumerate(f, start=1):
+            line = line.rstrip("\n")
+            if not line.strip():
+                continue
+            source, _, target = line.partition("\t")
+            pairs.append((number, source.strip(), target.strip()))
+    return pairs
+
+
+def run(pairs, out, workers=None):
+    """
+    Answers every pair and writes one JSON object per line to `out`.
+    Lines are grouped by source; `line` refers back to the input file.
+
+    With `workers` greater than one, source groups are searched in
+    that many worker processes.
+    """
+    lines = {}
+    resolved = []
+    for number, source, target in pairs:
+        source_id = degrees.resolve_person(source)
+        target_id = degrees.resolve_person(target)
+        if source_id is None or target_id is None:
+            missing = source if source_id is None else target
+            write(out, {"line": number, "source": source, "target": target,
+                        "error": f"person not found or ambiguous: {missing}"})
+            continue
+        lines.setdefault((source_id, target_id), []).append(number)
+        resolved.append((source_id, target_id))
+
+    if workers is not None and workers > 1:
+        results = parallel.batch_paths(resolved, workers)
+    else:
+        results = degrees.batch_paths(resolved)
+
+    for source_id, target_id, path in results:
+        numbers = lines[(source_id, target_id)]
+        result = {
+            "line": numbers.pop(0),
+            "source": source_id,
+            "target": target_id,
+            "degrees": None if path is None else len(path),
+            "path": path
+        }
+        write(out, result)
+
+
+def write(out, result):
+    out.write(json.dumps(result) + "\n")
+
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        sys.exit("Usage: python batch.py directory pairs.tsv [workers]")
+    workers = int(sys.argv[3]) if len(sys.argv) == 4 else None
+
+    degrees.load_data(sys.argv[1])
+    degrees.build_components()
+    run(read_pairs(sys.argv[2]), sys.stdout, workers)
+
+
+if __name__ == "__main__":
+    main()
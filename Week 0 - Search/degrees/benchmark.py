@@ -0,0 +1,153 @@
+import csv
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+from itertools import accumulate
+
+import degrees
+
+MODES = ("bfs", "movies", "bidirectional")
+
+# A timing this much slower than the baseline counts as a regression
+TOLERANCE = 1.2
+
+USAGE = """Usage: python benchmark.py generate directory people movies [seed]
+       python benchmark.py run directory [baseline.json] [queries]"""
+
+
+def generate(directory, num_people, num_movies, seed=0, alpha=1.5, min_cast=3, max_cast=500):
+    """
+    Writes a synthetic people.csv, movies.csv and stars.csv to
+    `directory`. Cast sizes follow a power law (Pareto with shape
+    `alpha`, from `min_cast` up to `max_cast`), so a few movies have huge
+    casts, and a few prolific people appear in many movies.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    with open(f"{directory}/people.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for person in range(num_people):
+            writer.writerow([person, f"Person {person}", rng.randint(1900, 2005)])
+
+    with open(f"{directory}/movies.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for movie in range(num_movies):
+            writer.writerow([movie, f"Movie {movie}", rng.randint(1920, 2024)])
+
+    # Weight people by a power law too so some are far better connected
+    weights = list(accumulate(rng.paretovariate(alpha) for _ in range(num_people)))
+    people = range(num_people)
+    with open(f"{directory}/stars.csv", "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for movie in range(num_movies):
+            cast = min(max_cast, int(min_cast * rng.paretovariate(alpha)))
+            for person in set(rng.choices(people, cum_weights=weights, k=cast)):
+                writer.writerow([person, movie])
+
+
+def percentiles(samples):
+    """
+    Returns p50, p90, p99 and max of a list of timings in milliseconds.
+    """
+    samples = sorted(samples)
+    result = {}
+    for name, fraction in (("p50", 0.5), ("p90", 0.9), ("p99", 0.99)):
+        result[name] = round(samples[min(len(samples) - 1, int(fraction * len(samples)))], 4)
+    result["max"] = round(samples[-1], 4)
+    return result
+
+
+def timed(function, *args, **kwargs):
+    start = time.perf_counter()
+    function(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000
+
+
+def run(directory, queries=200, seed=0):
+    """
+    Times loading (from CSV and from the snapshot), the memory peak of
+    a CSV load, neighbors_for_person and each shortest_path mode.
+    Returns the results as a dict of milliseconds and bytes.
+    """
+    results = {"directory": directory}
+    results["load_csv_ms"] = round(timed(degrees.load_data, directory, cache=False), 2)
+
+    tracemalloc.start()
+    degrees.load_data(directory, cache=False)
+    results["load_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    # Write the snapshot, then time reading it
+    degrees.load_data(directory)
+    results["load_snapshot_ms"] = round(timed(degrees.load_data, directory), 2)
+
+    rng = random.Random(seed)
+    people = [person_id for person_id in degrees.people
+              if len(degrees.graph.movies_for(degrees.graph.person_index[person_id]))]
+    pairs = [(rng.choice(people), rng.choice(people)) for _ in range(queries)]
+
+    results["neighbors_for_person"] = percentiles(
+        [timed(degrees.neighbors_for_person, source) for source, _ in pairs])
+    for mode in MODES:
+        results[f"shortest_path_{mode}"] = percentiles(
+            [timed(degrees.shortest_path, source, target, mode) for source, target in pairs])
+    return results
+
+
+def compare(results, baseline):
+    """
+    Returns a list of lines describing timings that got slower than
+    the baseline by more than TOLERANCE.
+    """
+    regressions = []
+    for key, value in results.items():
+        old = baseline.get(key)
+        if isinstance(value, dict) and isinstance(old, dict):
+            for name in value:
+                if old.get(name) and value[name] > old[name] * TOLERANCE:
+                    regressions.append(f"{key} {name}: {old[name]} -> {value[name]} ms")
+        elif key.endswith("_ms") and old and value > old * TOLERANCE:
+            regressions.append(f"{key}: {old} -> {value} ms")
+        elif key.endswith("_bytes") and old and value > old * TOLERANCE:
+            regressions.append(f"{key}: {old} -> {value}")
+    return regressions
+
+
+def main():
+    if len(sys.argv) in (5, 6) and sys.argv[1] == "generate":
+        seed = int(sys.argv[5]) if len(sys.argv) == 6 else 0
+        generate(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]), seed)
+        return
+    if not (len(sys.argv) in (3, 4, 5) and sys.argv[1] == "run"):
+        sys.exit(USAGE)
+
+    queries = int(sys.argv[4]) if len(sys.argv) == 5 else 200
+    results = run(sys.argv[2], queries)
+    print(json.dumps(results, indent=2))
+
+    if len(sys.argv) >= 4:
+        baseline_path = sys.argv[3]
+        if not os.path.exists(baseline_path):
+            with open(baseline_path, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+            print(f"Saved baseline to {baseline_path}.")
+            return
+        with open(baseline_path, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f))
+        for line in regressions:
+            print(f"Regression: {line}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions.")
+
+
+if __name__ == "__main__":
+    main()
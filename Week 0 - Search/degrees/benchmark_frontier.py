@@ -0,0 +1,82 @@
+import sys
+import time
+
+from util import Node, StackFrontier, QueueFrontier
+
+
+class ListStackFrontier():
+    """
+    The original list-backed frontier, kept here as a baseline.
+    """
+    def __init__(self):
+        self.frontier = []
+
+    def add(self, node):
+        self.frontier.append(node)
+
+    def contains_state(self, state):
+        return any(node.state == state for node in self.frontier)
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        node = self.frontier[-1]
+        self.frontier = self.frontier[:-1]
+        return node
+
+
+class ListQueueFrontier(ListStackFrontier):
+
+    def remove(self):
+        node = self.frontier[0]
+        self.frontier = self.frontier[1:]
+        return node
+
+
+# The list frontiers are quadratic, so larger sizes would take hours
+LIST_LIMIT = 10 ** 4
+
+
+def run(frontier_class, size):
+    """
+    Fills a frontier with `size` nodes, checking membership before each
+    add the way the search loops do, then drains it.
+    Returns the elapsed time in seconds.
+    """
+    frontier = frontier_class()
+    start = time.perf_counter()
+    for state in range(size):
+        if not frontier.contains_state(state):
+            frontier.add(Node(state=state, parent=None, action=None))
+    while not frontier.empty():
+        frontier.remove()
+    return time.perf_counter() - start
+
+
+def main():
+    if len(sys.argv) > 2:
+        sys.exit("Usage: python benchmark_frontier.py [max_exponent]")
+    max_exponent = int(sys.argv[1]) if len(sys.argv) == 2 else 6
+
+    pairs = [
+        ("stack", ListStackFrontier, StackFrontier),
+        ("queue", ListQueueFrontier, QueueFrontier)
+    ]
+    print(f"{'frontier':<8} {'size':>9} {'list (s)':>10} {'deque (s)':>10} {'speedup':>8}")
+    for exponent in range(3, max_exponent + 1):
+        size = 10 ** exponent
+        for kind, old, new in pairs:
+            new_time = run(new, size)
+            if size <= LIST_LIMIT:
+                old_time = run(old, size)
+                old_text = f"{old_time:10.4f}"
+                speedup = f"{old_time / new_time:7.1f}x"
+            else:
+                old_text = f"{'skipped':>10}"
+                speedup = f"{'-':>8}"
+            print(f"{kind:<8} {size:>9} {old_text} {new_time:10.4f} {speedup}")
+
+
+if __name__ == "__main__":
+    main()
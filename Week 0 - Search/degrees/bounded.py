@@ -0,0 +1,118 @@
+import time
+
+import degrees
+
+# Outcomes of BoundedSearch.run
+FOUND = "found"
+NOT_CONNECTED = "not connected"
+DEPTH_LIMIT = "depth limit"
+EXPANSION_LIMIT = "expansion limit"
+TIMEOUT = "timeout"
+
+
+class BoundedSearch():
+    """
+    A shortest path search between two person_ids that runs under
+    budgets and can be resumed where it stopped.
+
+    It is the movie-level BFS from degrees.movie_level_path, with its
+    frontier, predecessor table and position kept on the object.
+    """
+
+    def __init__(self, source, target):
+        self.graph = degrees.graph
+        self.source = self.graph.person_index[source]
+        self.target = self.graph.person_index[target]
+        self.parent_person, self.parent_movie = degrees.predecessor_table(self.source)
+        self.seen_movies = bytearray(len(self.graph.movie_ids))
+
+        # People at `depth` still to expand start at layer[position]
+        self.layer = [self.source]
+        self.position = 0
+        self.next_layer = []
+        self.depth = 0
+        self.expansions = 0
+
+        self.status = None
+        self.path = None
+        if self.source == self.target:
+            self.status = FOUND
+            self.path = []
+        elif not degrees.connected(self.source, self.target):
+            self.status = NOT_CONNECTED
+
+    def done(self):
+        return self.status in (FOUND, NOT_CONNECTED)
+
+    def lower_bound(self):
+        """
+        Returns the fewest degrees a path could still have: the path's
+        length once found, otherwise one past the deepest layer known
+        not to contain the target. Returns None if not connected.
+        """
+        if self.status == NOT_CONNECTED:
+            return None
+        if self.path is not None:
+            return len(self.path)
+        return self.depth + 1
+
+    def run(self, max_depth=None, max_expansions=None, timeout=None):
+        """
+        Continues the search until it finishes or a budget runs out:
+        `max_depth` degrees in total, `max_expansions` more people
+        expanded, or `timeout` more seconds.
+
+        Returns the status; on FOUND, `path` holds the (movie_id,
+        person_id) pairs. Any other status but NOT_CONNECTED can be
+        resumed by calling run again, with the same or new budgets.
+        """
+        if self.done():
+            return self.status
+
+        graph = self.graph
+        parent_person = self.parent_person
+        parent_movie = self.parent_movie
+        seen_movies = self.seen_movies
+        limit = None if max_expansions is None else self.expansions + max_expansions
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while self.layer:
+            if max_depth is not None and self.depth >= max_depth:
+                self.status = DEPTH_LIMIT
+                return self.status
+
+            while self.position < len(self.layer):
+                if limit is not None and self.expansions >= limit:
+                    self.status = EXPANSION_LIMIT
+                    return self.status
+                if deadline is not None and time.monotonic() >= deadline:
+                    self.status = TIMEOUT
+                    return self.status
+
+                person = self.layer[self.position]
+                self.position += 1
+                self.expansions += 1
+                for movie in graph.movies_for(person):
+                    if seen_movies[movie]:
+                        continue
+                    seen_movies[movie] = 1
+                    for neighbor in graph.stars_for(movie):
+                        if parent_person[neighbor] != degrees.UNREACHED:
+                            continue
+                        parent_person[neighbor] = person
+                        parent_movie[neighbor] = movie
+                        if neighbor == self.target:
+                            path = degrees.buildPath(parent_person, parent_movie,
+                                                     self.source, self.target)
+                            self.path = graph.path_ids(path)
+                            self.status = FOUND
+                            return self.status
+                        self.next_layer.append(neighbor)
+
+            self.layer = self.next_layer
+            self.next_layer = []
+            self.position = 0
+            self.depth += 1
+
+        self.status = NOT_CONNECTED
+        return self.status
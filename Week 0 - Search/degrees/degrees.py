@@ -1,56 +1,334 @@
 import csv
+import heapq
+import os
 from os import closerange
 import sys
+from array import array
+from collections import deque
+from operator import itemgetter
 
-from util import Node, StackFrontier, QueueFrontier
+import snapshot
+from graph import Graph
+from nameindex import NameIndex
+from pathcache import MISS, PathCache
+from records import Records
 
-# Maps names to a set of corresponding person_ids
+# Maps names to a tuple of corresponding person_ids
 names = {}
 
-# Maps person_ids to a dictionary of: name, birth, movies (a set of movie_ids)
-people = {}
+# Maps person_ids to a dictionary of: name, birth (see records.Records)
+people = Records("name", "birth")
 
-# Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
-movies = {}
+# Maps movie_ids to a dictionary of: title, year
+movies = Records("title", "year")
 
+# Star relation between people and movies, see graph.Graph
+graph = None
 
-def load_data(directory):
+# Predecessor table entry for people a search has not reached
+UNREACHED = -1
+
+# Optional landmarks.LandmarkIndex over `graph`, used by the "astar" mode
+landmark_index = None
+
+# nameindex.NameIndex over `names`, built on the first search_names call
+name_index = None
+
+# (labels, sizes) from graph.components() once build_components has run:
+# a component number per person index and a size per component
+components = None
+
+# Recent cached_shortest_path answers, cleared whenever data is loaded
+path_cache = PathCache()
+
+# apply_changes compacts `graph` once its overlay holds more star changes
+COMPACT_AFTER = 10000
+
+
+def load_data(directory, cache=True, prune=False):
     """
     Load data from CSV files into memory.
+
+    With `prune`, stars.csv is read first and only people and movies
+    that appear in it are kept.
+
+    With `cache`, a binary snapshot is written next to the CSV files
+    the first time and memory-mapped on later runs, as long as the
+    CSV files keep the same modification times and sizes.
+
+    Returns a dict counting the people, movies and star rows kept
+    and dropped. Indexes built over the previous data, including
+    `landmark_index`, are dropped.
     """
+    global graph, landmark_index, name_index, components
+    landmark_index = None
+    name_index = None
+    components = None
+    path_cache.clear()
+    names.clear()
+    people.clear()
+    movies.clear()
+
+    sources = snapshot.source_stats(directory)
+    path = f"{directory}/{snapshot.FILENAME}"
+    loaded = snapshot.read(path, sources, prune) if cache else None
+    if loaded is not None:
+        person_rows, movie_rows, graph, stats = loaded
+        for person_id, name, birth in person_rows:
+            add_person(person_id, name, birth)
+        for movie_id, title, year in movie_rows:
+            add_movie(movie_id, title, year)
+        return stats
+
+    stats = dict.fromkeys(("people", "movies", "stars",
+                           "dropped_people", "dropped_movies", "dropped_stars"), 0)
+
+    # Find the people and movies that have stars
+    if prune:
+        referenced_people = set()
+        referenced_movies = set()
+        for person_id, movie_id in read_rows(f"{directory}/stars.csv", "person_id", "movie_id"):
+            referenced_people.add(person_id)
+            referenced_movies.add(movie_id)
+
     # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
-            else:
-                names[row["name"].lower()].add(row["id"])
+    for person_id, name, birth in read_rows(f"{directory}/people.csv", "id", "name", "birth"):
+        if prune and person_id not in referenced_people:
+            stats["dropped_people"] += 1
+        else:
+            add_person(person_id, name, birth)
 
     # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
-
-    # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    for movie_id, title, year in read_rows(f"{directory}/movies.csv", "id", "title", "year"):
+        if prune and movie_id not in referenced_movies:
+            stats["dropped_movies"] += 1
+        else:
+            add_movie(movie_id, title, year)
+
+    if prune:
+        del referenced_people, referenced_movies
+
+    # Index people and movies densely in file order
+    person_ids = list(people)
+    movie_ids = list(movies)
+    person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+    movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+
+    # Load stars, streaming them into the graph builder
+    def stars():
+        for person_id, movie_id in read_rows(f"{directory}/stars.csv", "person_id", "movie_id"):
+            person = person_index.get(person_id)
+            movie = movie_index.get(movie_id)
+            if person is None or movie is None:
+                stats["dropped_stars"] += 1
+            else:
+                stats["stars"] += 1
+                yield person, movie
+
+    graph = Graph.from_stars(person_ids, movie_ids, stars())
+    stats["people"] = len(people)
+    stats["movies"] = len(movies)
+
+    if cache:
+        try:
+            snapshot.write(path, sources, prune, stats, people, movies, graph)
+        except OSError:
+            pass
+    return stats
+
+
+def load_landmarks(path):
+    """
+    Loads a landmarks.LandmarkIndex saved for the loaded data into
+    `landmark_index`.
+    """
+    global landmark_index
+    from landmarks import LandmarkIndex
+    landmark_index = LandmarkIndex.load(path, graph)
+
+
+def read_rows(path, *columns):
+    """
+    Yields a tuple of the named columns for each row of a CSV file,
+    locating them from the header row.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        yield from map(itemgetter(*[header.index(column) for column in columns]), reader)
+
+
+def add_person(person_id, name, birth):
+    """
+    Adds a person to `people` and `names`.
+    """
+    key = name.lower()
+    if person_id not in names.get(key, ()):
+        names[key] = names.get(key, ()) + (person_id,)
+    # Birth years repeat, so share one string per year
+    people.add(person_id, name, sys.intern(birth))
+
+
+def add_movie(movie_id, title, year):
+    """
+    Adds a movie to `movies`.
+    """
+    movies.add(movie_id, title, sys.intern(year))
+
+
+def remove_person(person_id):
+    """
+    Removes a person from `people` and `names`.
+    """
+    name = people.pop(person_id)["name"].lower()
+    person_ids = tuple(other for other in names[name] if other != person_id)
+    if person_ids:
+        names[name] = person_ids
+    else:
+        del names[name]
+
+
+def apply_changes(people_rows=(), movie_rows=(), star_rows=(),
+                  removed_stars=(), removed_people=(), removed_movies=(), compact=False):
+    """
+    Applies changes to the loaded data in place, without a reload.
+
+    Rows are tuples laid out like the CSV files: (id, name, birth),
+    (id, title, year) and (person_id, movie_id). Existing ids in
+    `people_rows` or `movie_rows` are updated. Removing a person or a
+    movie also removes their star rows.
+
+    Star changes go into the graph's overlay. With `compact`, or once
+    the overlay holds more than COMPACT_AFTER changes, `graph` is
+    replaced by a compacted copy so lookups are fast again.
+
+    Derived indexes are kept current, and only the cached paths the
+    change could affect are dropped from `path_cache`.
+
+    Returns a dict counting what was applied.
+    """
+    global graph, name_index, components
+    stats = dict.fromkeys(("people", "movies", "stars", "dropped_stars", "removed_people",
+                           "removed_movies", "removed_stars", "invalidated"), 0)
+
+    for person_id, name, birth in people_rows:
+        if person_id in people:
+            remove_person(person_id)
+        add_person(person_id, name, birth)
+        graph.add_person(person_id)
+        stats["people"] += 1
+
+    for movie_id, title, year in movie_rows:
+        add_movie(movie_id, title, year)
+        graph.add_movie(movie_id)
+        stats["movies"] += 1
+
+    # Collect star rows to remove before any person or movie goes
+    unstar = set(removed_stars)
+    for person_id in removed_people:
+        if person_id in people:
+            person = graph.person_index[person_id]
+            unstar.update((person_id, graph.movie_ids[movie]) for movie in graph.movies_for(person))
+            remove_person(person_id)
+            stats["removed_people"] += 1
+    for movie_id in removed_movies:
+        if movie_id in movies:
+            movie = graph.movie_index[movie_id]
+            unstar.update((graph.person_ids[person], movie_id) for person in graph.stars_for(movie))
+            del movies[movie_id]
+            stats["removed_movies"] += 1
+
+    removed = set()
+    for person_id, movie_id in unstar:
+        person = graph.person_index.get(person_id)
+        movie = graph.movie_index.get(movie_id)
+        if person is not None and movie is not None and graph.remove_star(person, movie):
+            removed.add((person_id, movie_id))
+    stats["removed_stars"] = len(removed)
+
+    added = []
+    for person_id, movie_id in star_rows:
+        if person_id not in people or movie_id not in movies:
+            stats["dropped_stars"] += 1
+            continue
+        person = graph.person_index[person_id]
+        movie = graph.movie_index[movie_id]
+        if graph.add_star(person, movie):
+            added.append((person, movie))
+    stats["stars"] = len(added)
+
+    if compact or graph.overlay_size() > COMPACT_AFTER:
+        graph = graph.compact()
+
+    # Derived indexes
+    if people_rows or removed_people:
+        name_index = None
+    if landmark_index is not None:
+        if added or removed:
+            landmark_index.refresh(graph)
+        else:
+            landmark_index.extend(len(graph.person_ids))
+    if components is not None and (added or removed or people_rows):
+        components = graph.components()
+    stats["invalidated"] = invalidate_paths(added, removed)
+    return stats
+
+
+def invalidate_paths(added, removed):
+    """
+    Drops cached paths that added (person, movie) index pairs or removed
+    (person_id, movie_id) pairs could have changed. Returns how many
+    were dropped.
+
+    A removal only breaks paths that used it. An addition can only
+    shorten paths between other people if it gives a movie with other
+    stars to a person who has other movies; otherwise it only affects
+    queries about that person.
+    """
+    shortcut = False
+    endpoints = set()
+    for person, movie in added:
+        if len(graph.movies_for(person)) > 1 and len(graph.stars_for(movie)) > 1:
+            shortcut = True
+            break
+        endpoints.add(graph.person_ids[person])
+
+    def stale(source, target, path):
+        if source in endpoints or target in endpoints:
+            return True
+        if path is None:
+            return shortcut
+        if shortcut and len(path) > 1:
+            return True
+        previous = source
+        for movie_id, person_id in path:
+            if (previous, movie_id) in removed or (person_id, movie_id) in removed:
+                return True
+            previous = person_id
+        return False
+
+    if not added and not removed:
+        return 0
+    return path_cache.discard_if(stale)
+
+
+def load_updates(directory):
+    """
+    Applies the rows of whichever of people.csv, movies.csv and
+    stars.csv exist in `directory` (for example a day's new rows)
+    with apply_changes, compacting the graph afterwards. Returns its
+    counts.
+    """
+    def rows(filename, *columns):
+        path = f"{directory}/{filename}"
+        return list(read_rows(path, *columns)) if os.path.exists(path) else []
+
+    return apply_changes(
+        people_rows=rows("people.csv", "id", "name", "birth"),
+        movie_rows=rows("movies.csv", "id", "title", "year"),
+        star_rows=rows("stars.csv", "person_id", "movie_id"),
+        compact=True
+    )
 
 
 def main():
@@ -60,8 +338,10 @@ def main():
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    stats = load_data(directory)
     print("Data loaded.")
+    if stats["dropped_stars"]:
+        print(f"Skipped {stats['dropped_stars']} star rows for unknown people or movies.")
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -70,7 +350,7 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
+    path = shortest_path(source, target, mode="bidirectional")
 
     if path is None:
         print("Not connected.")
@@ -85,50 +365,547 @@ def main():
             print(f"{i + 1}: {person1} and {person2} starred in {movie}")
 
 
-def shortest_path(source, target):
+def shortest_path(source, target, mode="bfs", stats=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
+    `mode` selects the search: "bfs" grows one frontier from the
+    source, "movies" does the same but expands each movie only once,
+    "bidirectional" grows frontiers from both ends, and "astar" is
+    guided by `landmark_index` bounds.
+
+    Pass a util.SearchStats as `stats` to record what the search did.
+
     If no possible path, returns None.
     """
+    if mode == "movies":
+        search = movie_level_path
+    elif mode == "bidirectional":
+        search = bidirectional_path
+    elif mode == "astar":
+        search = astar_path
+    elif mode == "bfs":
+        search = breadth_first_path
+    else:
+        raise ValueError(f"unknown search mode: {mode}")
+
+    source, target = graph.person_index[source], graph.person_index[target]
+    if not connected(source, target):
+        return None
+    if stats is None:
+        path = search(source, target)
+    else:
+        with stats.phase("search"):
+            path = search(source, target, stats)
+    if path is None:
+        return None
+    return graph.path_ids(path)
 
-    # Initialize frontier to starting position and use BFS
-    start = Node(state=source, parent=None, action=None)
-    frontier = QueueFrontier()
-    frontier.add(start)
 
-    # Initialize empty explored set
-    explored = set()
+def build_components():
+    """
+    Labels every person with its connected component, so searches
+    between people in different components are rejected immediately.
+    Returns (labels, sizes).
+    """
+    global components
+    components = graph.components()
+    return components
+
+
+def connected(source, target):
+    """
+    Returns False if the component labels show the two person indices
+    are not connected, True otherwise (including when no labels have
+    been built).
+    """
+    if components is None:
+        return True
+    return components[0][source] == components[0][target]
 
-    # Keep looping until solution found
-    while True:
 
-        # If nothing left in frontier, then there is no path
-        if frontier.empty():
-            return None
+def component_size(person_id):
+    """
+    Returns the number of people in a person's connected component.
+    """
+    labels, sizes = components or build_components()
+    return sizes[labels[graph.person_index[person_id]]]
 
-        # Take a node from the frontier
-        node = frontier.remove()
 
-        # Mark node as explored
-        explored.add(node.state)
+def cached_shortest_path(source, target, mode="bidirectional"):
+    """
+    Same as shortest_path, but answers repeated (or reversed) queries
+    from `path_cache`.
+    """
+    path = path_cache.get(source, target)
+    if path is MISS:
+        path = shortest_path(source, target, mode)
+        path_cache.put(source, target, path)
+    return path
+
+
+def breadth_first_path(source, target, stats=None):
+    """
+    Returns the shortest list of (movie, person) index pairs
+    that connect the source to the target person index.
+
+    Parents live in a predecessor table of two int arrays indexed by
+    person rather than in a Node per reached person.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    # Initialize predecessor table and frontier to starting position
+    parent_person, parent_movie = predecessor_table(source)
+    frontier = deque([source])
+
+    # Keep looping until solution found
+    while frontier:
+        if stats is not None:
+            stats.frontier_size(len(frontier))
+            stats.expanded += 1
+
+        # Take a person from the frontier
+        person = frontier.popleft()
 
         # Add neighbors to frontier
-        for action, state in neighbors_for_person(node.state):
-            if not frontier.contains_state(state) and state not in explored:
-                child = Node(state=state, parent=node, action=action)
-                # If node is the goal, then it is a solution
-                if child.state == target:
-                    return buildPath(child)
-                frontier.add(child)
+        for movie, neighbor in graph.neighbors(person):
+            if parent_person[neighbor] == UNREACHED:
+                parent_person[neighbor] = person
+                parent_movie[neighbor] = movie
+                if stats is not None:
+                    stats.generated += 1
+                    stats.explored = stats.generated + 1
+                # If person is the goal, then it is a solution
+                if neighbor == target:
+                    return buildPath(parent_person, parent_movie, source, target)
+                frontier.append(neighbor)
+
+    # If nothing left in frontier, then there is no path
+    return None
+
+
+def movie_level_path(source, target, stats=None):
+    """
+    Returns the shortest list of (movie, person) index pairs
+    that connect the source to the target person index.
 
+    BFS over the bipartite person-movie graph: movies are marked
+    visited too, so each cast list is scanned at most once, and parents
+    are kept in a predecessor table rather than per-neighbor tuples.
 
-def buildPath(node):
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    parent_person, parent_movie = predecessor_table(source)
+    seen_movies = bytearray(len(graph.movie_ids))
+    layer = [source]
+    while layer:
+        if stats is not None:
+            stats.frontier_size(len(layer))
+        next_layer = []
+        for person in layer:
+            if stats is not None:
+                stats.expanded += 1
+            for movie in graph.movies_for(person):
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for neighbor in graph.stars_for(movie):
+                    if parent_person[neighbor] != UNREACHED:
+                        continue
+                    parent_person[neighbor] = person
+                    parent_movie[neighbor] = movie
+                    if stats is not None:
+                        stats.generated += 1
+                        stats.explored = stats.generated + 1
+                    if neighbor == target:
+                        return buildPath(parent_person, parent_movie, source, target)
+                    next_layer.append(neighbor)
+        layer = next_layer
+    return None
+
+
+def predecessor_table(source):
+    """
+    Returns (parent_person, parent_movie) int arrays over all person
+    indices, UNREACHED everywhere except the source, which is its
+    own parent.
+    """
+    parent_person = array("i", [UNREACHED]) * len(graph.person_ids)
+    parent_movie = array("i", [UNREACHED]) * len(graph.person_ids)
+    parent_person[source] = source
+    return parent_person, parent_movie
+
+
+def bidirectional_path(source, target, stats=None):
+    """
+    Returns the shortest list of (movie, person) index pairs
+    that connect the source to the target person index, searching
+    from both ends and always expanding the smaller frontier one full
+    layer at a time.
+
+    If no possible path, returns None.
+    """
+    if source == target:
+        return []
+
+    # Each side maps a person to (movie, person) of the step
+    # towards its own root, and remembers its distance from that root
+    forward = {source: None}
+    backward = {target: None}
+    forward_depth = {source: 0}
+    backward_depth = {target: 0}
+    forward_layer = [source]
+    backward_layer = [target]
+
+    # Movies each side has already expanded
+    forward_movies = set()
+    backward_movies = set()
+
+    while forward_layer and backward_layer:
+
+        # Expand the smaller side
+        if len(forward_layer) <= len(backward_layer):
+            layer, parents, depth, seen = forward_layer, forward, forward_depth, forward_movies
+            other, other_depth = backward, backward_depth
+        else:
+            layer, parents, depth, seen = backward_layer, backward, backward_depth, backward_movies
+            other, other_depth = forward, forward_depth
+
+        if stats is not None:
+            stats.frontier_size(len(forward_layer) + len(backward_layer))
+            stats.expanded += len(layer)
+
+        # Finish the whole layer so the best meeting point is kept
+        best = None
+        next_layer = []
+        for person in layer:
+            for movie in graph.movies_for(person):
+                if movie in seen:
+                    continue
+                seen.add(movie)
+                for neighbor in graph.stars_for(movie):
+                    if neighbor in parents:
+                        continue
+                    parents[neighbor] = (movie, person)
+                    depth[neighbor] = depth[person] + 1
+                    next_layer.append(neighbor)
+                    if neighbor in other:
+                        length = depth[neighbor] + other_depth[neighbor]
+                        if best is None or length < best[0]:
+                            best = (length, neighbor)
+
+        if stats is not None:
+            stats.generated = stats.explored = len(forward) + len(backward)
+        if best is not None:
+            return joinPaths(forward, backward, best[1])
+
+        if parents is forward:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+
+    return None
+
+
+def astar_path(source, target, stats=None):
+    """
+    Returns the shortest list of (movie, person) index pairs that
+    connect the source to the target person index, using A* with
+    landmark lower bounds as the heuristic. Without a landmark index
+    this is a plain uniform-cost search.
+
+    If no possible path, returns None.
+    """
+    index = landmark_index
+    if index is not None and index.bounds(source, target) is None:
+        return None
+
+    def heuristic(person):
+        return index.lower_bound(person, target) if index is not None else 0
+
+    parents = {source: None}
+    cost = {source: 0}
+    frontier = [(heuristic(source), 0, source)]
+    closed = set()
+    found = False
+    while frontier:
+        if stats is not None:
+            stats.frontier_size(len(frontier))
+        _, g, person = heapq.heappop(frontier)
+        if person == target:
+            found = True
+            break
+        if person in closed:
+            continue
+        closed.add(person)
+        if stats is not None:
+            stats.expanded += 1
+        for movie, neighbor in graph.neighbors(person):
+            if neighbor in closed or cost.get(neighbor, g + 2) <= g + 1:
+                continue
+            cost[neighbor] = g + 1
+            parents[neighbor] = (movie, person)
+            heapq.heappush(frontier, (g + 1 + heuristic(neighbor), g + 1, neighbor))
+            if stats is not None:
+                stats.generated += 1
+
+    if stats is not None:
+        stats.explored = len(closed)
+    if found:
+        return parentPath(parents, target)
+    return None
+
+
+def degrees_of_separation(source, target):
+    """
+    Returns (lower, upper) bounds on the degrees of separation between
+    two person_ids from `landmark_index` alone, without searching.
+    `upper` is None when no landmark reaches both people.
+
+    Returns None if the two people are known not to be connected.
+    """
+    return landmark_index.bounds(graph.person_index[source], graph.person_index[target])
+
+
+def joinPaths(forward, backward, meeting):
+    """
+    Builds the (movie, person) path through `meeting` from the
+    parent maps of a bidirectional search.
+    """
     path = []
-    while node.parent is not None:
-        path.append((node.action, node.state))
-        node = node.parent
+    person = meeting
+    while forward[person] is not None:
+        movie, parent = forward[person]
+        path.append((movie, person))
+        person = parent
+    path.reverse()
+
+    person = meeting
+    while backward[person] is not None:
+        movie, person = backward[person]
+        path.append((movie, person))
+    return path
+
+
+def shortest_paths_from(source, targets):
+    """
+    Returns a dict mapping each person_id in `targets` to its shortest
+    list of (movie_id, person_id) pairs from `source`, using one BFS
+    for all of them. Unreachable targets map to None.
+    """
+    source_index = graph.person_index[source]
+    wanted = {graph.person_index[target] for target in targets}
+    wanted = {target for target in wanted if connected(source_index, target)}
+    parents = parent_map(source_index, wanted)
+
+    paths = {}
+    for target in targets:
+        target_index = graph.person_index[target]
+        if target_index in parents:
+            paths[target] = graph.path_ids(parentPath(parents, target_index))
+        else:
+            paths[target] = None
+    return paths
+
+
+def parent_map(source, targets):
+    """
+    Runs a BFS from the source person index until every person index in
+    `targets` has been reached (or the component is exhausted).
+
+    Returns a dict mapping each reached person index to the
+    (movie, person) step towards the source, or None for the source.
+    """
+    parents = {source: None}
+    remaining = set(targets)
+    remaining.discard(source)
+    seen_movies = bytearray(len(graph.movie_ids))
+    layer = [source]
+    while layer and remaining:
+        next_layer = []
+        for person in layer:
+            for movie in graph.movies_for(person):
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for neighbor in graph.stars_for(movie):
+                    if neighbor not in parents:
+                        parents[neighbor] = (movie, person)
+                        next_layer.append(neighbor)
+                        remaining.discard(neighbor)
+        layer = next_layer
+    return parents
+
+
+def parentPath(parents, person):
+    """
+    Builds the (movie, person) path to `person` from a parent map.
+    """
+    path = []
+    while parents[person] is not None:
+        movie, parent = parents[person]
+        path.append((movie, person))
+        person = parent
+    path.reverse()
+    return path
+
+
+def all_shortest_paths(source, target):
+    """
+    Yields every shortest list of (movie_id, person_id) pairs that
+    connects the source to the target, one at a time.
+
+    Yields nothing if no possible path.
+    """
+    source_index = graph.person_index[source]
+    target_index = graph.person_index[target]
+    dag = shortest_path_dag(source_index, target_index)
+    if dag is None:
+        return
+    for path in dag_paths(source_index, target_index, *dag):
+        yield graph.path_ids(path)
+
+
+def k_shortest_paths(source, target, k, key=None):
+    """
+    Returns the first `k` shortest paths from source to target ranked
+    by `key` (smallest first), by default the newest movies first.
+    Only `k` paths are held in memory at once.
+    """
+    return heapq.nsmallest(k, all_shortest_paths(source, target), key=key or newest_movies)
+
+
+def newest_movies(path):
+    """
+    Ranking key preferring paths through recent movies.
+    """
+    return -sum(int(movies.get_field(movie_id, "year") or 0) for movie_id, _ in path)
+
+
+def biggest_casts(path):
+    """
+    Ranking key preferring paths through movies with many stars, a
+    stand-in for popularity.
+    """
+    return -sum(len(graph.stars_for(graph.movie_index[movie_id])) for movie_id, _ in path)
+
+
+def shortest_path_dag(source, target):
+    """
+    Runs a layered BFS from the source person index and records every
+    shortest-path parent as a bipartite DAG: `person_parents` maps a
+    person index to the movies that reach it from the previous layer,
+    and `movie_parents` maps a movie to the people of that layer in it.
+    Parent lists are int arrays.
+
+    Returns (person_parents, movie_parents), or None if the target
+    is unreachable.
+    """
+    person_depth = {source: 0}
+    person_parents = {}
+    movie_parents = {}
+    layer = [source]
+    depth = 0
+    while layer and target not in person_depth:
+        new_movies = []
+        for person in layer:
+            for movie in graph.movies_for(person):
+                parents = movie_parents.get(movie)
+                if parents is None:
+                    movie_parents[movie] = array("i", [person])
+                    new_movies.append(movie)
+                elif person_depth[parents[0]] == depth:
+                    # Reached again from this same layer: another parent
+                    parents.append(person)
+
+        depth += 1
+        layer = []
+        for movie in new_movies:
+            for person in graph.stars_for(movie):
+                if person not in person_depth:
+                    person_depth[person] = depth
+                    person_parents[person] = array("i", [movie])
+                    layer.append(person)
+                elif person_depth[person] == depth:
+                    person_parents[person].append(movie)
+
+    if target not in person_depth:
+        return None
+    return person_parents, movie_parents
+
+
+def dag_paths(source, target, person_parents, movie_parents):
+    """
+    Lazily yields every (movie, person) index path from source to target
+    through a DAG built by shortest_path_dag, walking back from the
+    target with an explicit stack.
+    """
+    if source == target:
+        yield []
+        return
+
+    # Each frame: (person, its candidate (movie, parent) steps)
+    steps = []
+    stack = [iter_steps(target, person_parents, movie_parents)]
+    people = [target]
+    while stack:
+        step = next(stack[-1], None)
+        if step is None:
+            stack.pop()
+            people.pop()
+            if steps:
+                steps.pop()
+            continue
+        movie, parent = step
+        steps.append((movie, people[-1]))
+        if parent == source:
+            yield steps[::-1]
+            steps.pop()
+        else:
+            stack.append(iter_steps(parent, person_parents, movie_parents))
+            people.append(parent)
+
+
+def iter_steps(person, person_parents, movie_parents):
+    """
+    Yields the (movie, parent) steps leading back from a person.
+    """
+    for movie in person_parents[person]:
+        for parent in movie_parents[movie]:
+            yield movie, parent
+
+
+def batch_paths(pairs):
+    """
+    Yields (source, target, path) for each (source, target) pair of
+    person_ids, running one BFS per distinct source. Results come out
+    grouped by source, in order of each source's first appearance.
+    """
+    targets = {}
+    for source, target in pairs:
+        targets.setdefault(source, []).append(target)
+    for source, source_targets in targets.items():
+        paths = shortest_paths_from(source, source_targets)
+        for target in source_targets:
+            yield source, target, paths[target]
+
+
+def buildPath(parent_person, parent_movie, source, target):
+    """
+    Builds the (movie, person) path to `target` from a predecessor table.
+    """
+    path = []
+    person = target
+    while person != source:
+        path.append((parent_movie[person], person))
+        person = parent_person[person]
     path.reverse()
     return path
 
@@ -138,7 +915,7 @@ def person_id_for_name(name):
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
     """
-    person_ids = list(names.get(name.lower(), set()))
+    person_ids = list(names.get(name.lower(), ()))
     if len(person_ids) == 0:
         return None
     elif len(person_ids) > 1:
@@ -159,16 +936,39 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def search_names(query, limit=10):
+    """
+    Returns up to `limit` (person_id, score) candidates for `query`,
+    best first: exact name matches, then prefix matches, then
+    typo-tolerant trigram matches. Never prompts.
+    """
+    global name_index
+    if name_index is None:
+        name_index = NameIndex(names)
+    return name_index.search(query, limit)
+
+
+def resolve_person(value):
+    """
+    Returns the person_id for `value`, which may be an IMDB id or a
+    name. Returns None if it matches nobody or more than one person.
+    """
+    if value in people:
+        return value
+    person_ids = names.get(value.lower(), ())
+    if len(person_ids) == 1:
+        return person_ids[0]
+    return None
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
-    movie_ids = people[person_id]["movies"]
     neighbors = set()
-    for movie_id in movie_ids:
-        for person_id in movies[movie_id]["stars"]:
-            neighbors.add((movie_id, person_id))
+    for movie, person in graph.neighbors(graph.person_index[person_id]):
+        neighbors.add((graph.movie_ids[movie], graph.person_ids[person]))
     return neighbors
 
 
@@ -0,0 +1,242 @@
+from array import array
+
+
+class Graph():
+    """
+    Bipartite person-movie star relation over dense integer indices.
+
+    Each side is stored in CSR form: the movies of person `p` are
+    `person_movies[person_offsets[p]:person_offsets[p + 1]]`, and the
+    stars of movie `m` are `movie_people[movie_offsets[m]:movie_offsets[m + 1]]`.
+
+    Incremental changes are kept in a small overlay on top of the CSR
+    arrays (`extra_movies`, `extra_stars` and `removed`) until `compact`
+    folds them in.
+    """
+
+    def __init__(self, person_ids, movie_ids,
+                 person_offsets, person_movies, movie_offsets, movie_people):
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        self.person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        self.movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_people = movie_people
+
+        # Overlay: person -> added movies, movie -> added people,
+        # and removed (person, movie) pairs still present in the arrays
+        self.extra_movies = {}
+        self.extra_stars = {}
+        self.removed = set()
+
+    @classmethod
+    def from_stars(cls, person_ids, movie_ids, stars):
+        """
+        Builds a graph from lists of person and movie ids and an iterable
+        of (person_index, movie_index) star pairs. Duplicate pairs are
+        stored once.
+        """
+        num_people = len(person_ids)
+        num_movies = len(movie_ids)
+
+        # Encode each pair as one int so sorting groups them by person
+        keys = sorted({person * num_movies + movie for person, movie in stars})
+
+        person_offsets = array("i", bytes(4 * (num_people + 1)))
+        person_movies = array("i", bytes(4 * len(keys)))
+        movie_counts = array("i", bytes(4 * (num_movies + 1)))
+        for i, key in enumerate(keys):
+            person, movie = divmod(key, num_movies)
+            person_offsets[person + 1] += 1
+            person_movies[i] = movie
+            movie_counts[movie + 1] += 1
+        for i in range(num_people):
+            person_offsets[i + 1] += person_offsets[i]
+        for i in range(num_movies):
+            movie_counts[i + 1] += movie_counts[i]
+
+        # Scatter people into their movies' slots
+        movie_offsets = array("i", movie_counts)
+        movie_people = array("i", bytes(4 * len(keys)))
+        for person in range(num_people):
+            for i in range(person_offsets[person], person_offsets[person + 1]):
+                movie = person_movies[i]
+                movie_people[movie_counts[movie]] = person
+                movie_counts[movie] += 1
+
+        return cls(person_ids, movie_ids,
+                   person_offsets, person_movies, movie_offsets, movie_people)
+
+    def patched(self):
+        """
+        Returns True if the overlay holds changes not yet compacted.
+        """
+        return bool(self.extra_movies or self.removed)
+
+    def overlay_size(self):
+        """
+        Returns the number of star changes held in the overlay.
+        """
+        return sum(map(len, self.extra_movies.values())) + len(self.removed)
+
+    def movies_for(self, person):
+        """
+        Returns the movie indices a person index starred in.
+        """
+        base = ()
+        if person < len(self.person_offsets) - 1:
+            base = self.person_movies[self.person_offsets[person]:self.person_offsets[person + 1]]
+        if not self.patched():
+            return base
+        movies = [movie for movie in base if (person, movie) not in self.removed]
+        movies.extend(self.extra_movies.get(person, ()))
+        return movies
+
+    def stars_for(self, movie):
+        """
+        Returns the person indices that starred in a movie index.
+        """
+        base = ()
+        if movie < len(self.movie_offsets) - 1:
+            base = self.movie_people[self.movie_offsets[movie]:self.movie_offsets[movie + 1]]
+        if not self.patched():
+            return base
+        people = [person for person in base if (person, movie) not in self.removed]
+        people.extend(self.extra_stars.get(movie, ()))
+        return people
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) index pairs for people who starred
+        with a given person index.
+        """
+        if self.patched() or person >= len(self.person_offsets) - 1:
+            for movie in self.movies_for(person):
+                for neighbor in self.stars_for(movie):
+                    yield movie, neighbor
+            return
+
+        person_offsets = self.person_offsets
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_people = self.movie_people
+        for i in range(person_offsets[person], person_offsets[person + 1]):
+            movie = person_movies[i]
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_people[j]
+
+    def add_person(self, person_id):
+        """
+        Returns the index of a person_id, giving new ids the next index.
+        """
+        if person_id not in self.person_index:
+            self.person_index[person_id] = len(self.person_ids)
+            self.person_ids.append(person_id)
+        return self.person_index[person_id]
+
+    def add_movie(self, movie_id):
+        """
+        Returns the index of a movie_id, giving new ids the next index.
+        """
+        if movie_id not in self.movie_index:
+            self.movie_index[movie_id] = len(self.movie_ids)
+            self.movie_ids.append(movie_id)
+        return self.movie_index[movie_id]
+
+    def in_arrays(self, person, movie):
+        """
+        Returns True if the CSR arrays hold the (person, movie) pair.
+        """
+        if person >= len(self.person_offsets) - 1:
+            return False
+        start, end = self.person_offsets[person], self.person_offsets[person + 1]
+        return movie in self.person_movies[start:end]
+
+    def add_star(self, person, movie):
+        """
+        Records that a person index starred in a movie index.
+        Returns False if that was already known.
+        """
+        if (person, movie) in self.removed:
+            self.removed.discard((person, movie))
+        elif self.in_arrays(person, movie) or movie in self.extra_movies.get(person, ()):
+            return False
+        else:
+            self.extra_movies.setdefault(person, set()).add(movie)
+            self.extra_stars.setdefault(movie, set()).add(person)
+        return True
+
+    def remove_star(self, person, movie):
+        """
+        Forgets that a person index starred in a movie index.
+        Returns False if that was not known.
+        """
+        if movie in self.extra_movies.get(person, ()):
+            for overlay, key, value in ((self.extra_movies, person, movie),
+                                        (self.extra_stars, movie, person)):
+                overlay[key].discard(value)
+                if not overlay[key]:
+                    del overlay[key]
+        elif self.in_arrays(person, movie) and (person, movie) not in self.removed:
+            self.removed.add((person, movie))
+        else:
+            return False
+        return True
+
+    def compact(self):
+        """
+        Returns a new graph with the overlay folded into the CSR arrays.
+        """
+        stars = ((person, movie)
+                 for person in range(len(self.person_ids))
+                 for movie in self.movies_for(person))
+        return Graph.from_stars(list(self.person_ids), list(self.movie_ids), stars)
+
+    def components(self):
+        """
+        Labels each person index with its connected component (people
+        are connected through shared movies) using array-backed
+        union-find.
+
+        Returns (labels, sizes): labels[person] is a component number
+        and sizes[label] is the number of people in that component.
+        """
+        parent = array("i", range(len(self.person_ids)))
+
+        def find(person):
+            while parent[person] != person:
+                # Path halving
+                parent[person] = parent[parent[person]]
+                person = parent[person]
+            return person
+
+        for movie in range(len(self.movie_ids)):
+            stars = self.stars_for(movie)
+            if len(stars) < 2:
+                continue
+            root = find(stars[0])
+            for person in stars[1:]:
+                other = find(person)
+                if other != root:
+                    parent[other] = root
+
+        labels = array("i", bytes(4 * len(parent)))
+        numbers = {}
+        sizes = array("i")
+        for person in range(len(parent)):
+            root = find(person)
+            if root not in numbers:
+                numbers[root] = len(sizes)
+                sizes.append(0)
+            labels[person] = numbers[root]
+            sizes[numbers[root]] += 1
+        return labels, sizes
+
+    def path_ids(self, path):
+        """
+        Converts a list of (movie, person) index pairs into
+        (movie_id, person_id) pairs.
+        """
+        return [(self.movie_ids[movie], self.person_ids[person]) for movie, person in path]
@@ -0,0 +1,186 @@
+import json
+import struct
+import sys
+
+from array import array
+
+import degrees
+
+MAGIC = b"DEGLMK\0\0"
+VERSION = 1
+
+# Magic, version, header length
+PREFIX = struct.Struct("<8sII")
+
+# Distance stored for people a landmark cannot reach
+UNREACHABLE = -1
+
+
+def distances_from(graph, source):
+    """
+    Returns an array of BFS distances (degrees of separation) from the
+    source person index to every person index, with UNREACHABLE for
+    people in other components.
+    """
+    distances = array("h", [UNREACHABLE]) * len(graph.person_ids)
+    distances[source] = 0
+    seen_movies = bytearray(len(graph.movie_ids))
+    layer = [source]
+    depth = 0
+    while layer:
+        depth += 1
+        next_layer = []
+        for person in layer:
+            for movie in graph.movies_for(person):
+                if seen_movies[movie]:
+                    continue
+                seen_movies[movie] = 1
+                for neighbor in graph.stars_for(movie):
+                    if distances[neighbor] == UNREACHABLE:
+                        distances[neighbor] = depth
+                        next_layer.append(neighbor)
+        layer = next_layer
+    return distances
+
+
+def pick_landmarks(graph, k, include=()):
+    """
+    Returns `k` person indices: those in `include` first, then the
+    people with the most co-star links (summed cast sizes).
+    """
+    chosen = list(include)[:k]
+    links = []
+    for person in range(len(graph.person_ids)):
+        if person in chosen:
+            continue
+        total = 0
+        for movie in graph.movies_for(person):
+            total += len(graph.stars_for(movie))
+        links.append((total, person))
+    links.sort(reverse=True)
+    chosen.extend(person for _, person in links[:k - len(chosen)])
+    return chosen
+
+
+class LandmarkIndex():
+    """
+    BFS distances from a few landmark people to everyone, giving
+    triangle-inequality bounds on the degrees between any two people.
+    """
+
+    def __init__(self, landmarks, distances):
+        self.landmarks = landmarks
+        self.distances = distances
+
+    @classmethod
+    def build(cls, graph, k=8, include=()):
+        """
+        Picks `k` landmarks (see pick_landmarks) and runs one BFS from each.
+        """
+        landmarks = pick_landmarks(graph, k, include)
+        return cls(landmarks, [distances_from(graph, landmark) for landmark in landmarks])
+
+    def refresh(self, graph):
+        """
+        Recomputes the distances from the same landmarks after the
+        graph has changed.
+        """
+        self.distances = [distances_from(graph, landmark) for landmark in self.landmarks]
+
+    def extend(self, people):
+        """
+        Pads the distances to cover `people` person indices after people
+        were added to the graph. New people are UNREACHABLE until a
+        refresh, which is exact for people with no movies yet.
+        """
+        for distances in self.distances:
+            if len(distances) < people:
+                distances.extend(array("h", [UNREACHABLE]) * (people - len(distances)))
+
+    def bounds(self, source, target):
+        """
+        Returns (lower, upper) bounds on the degrees between two person
+        indices, where upper may be None if no landmark reaches both.
+        Returns None if some landmark proves they are not connected.
+        """
+        lower = 0
+        upper = None
+        for distances in self.distances:
+            a = distances[source]
+            b = distances[target]
+            if (a == UNREACHABLE) != (b == UNREACHABLE):
+                return None
+            if a == UNREACHABLE:
+                continue
+            lower = max(lower, abs(a - b))
+            if upper is None or a + b < upper:
+                upper = a + b
+        return lower, upper
+
+    def lower_bound(self, source, target):
+        """
+        Returns a lower bound on the degrees between two person indices
+        (0 if the index has nothing to say). Suitable as an A* heuristic.
+        """
+        lower = 0
+        for distances in self.distances:
+            a = distances[source]
+            b = distances[target]
+            if a != UNREACHABLE and b != UNREACHABLE and abs(a - b) > lower:
+                lower = abs(a - b)
+        return lower
+
+    def save(self, path, graph):
+        """
+        Writes the index to `path`, keyed by landmark person_ids.
+        """
+        header = json.dumps({
+            "people": len(graph.person_ids),
+            "landmarks": [graph.person_ids[landmark] for landmark in self.landmarks]
+        }).encode("utf-8")
+        header += b" " * (-(PREFIX.size + len(header)) % 2)
+        with open(path, "wb") as f:
+            f.write(PREFIX.pack(MAGIC, VERSION, len(header)))
+            f.write(header)
+            for distances in self.distances:
+                f.write(distances.tobytes())
+
+    @classmethod
+    def load(cls, path, graph):
+        """
+        Reads an index written by `save` for the same dataset.
+        """
+        with open(path, "rb") as f:
+            magic, version, length = PREFIX.unpack(f.read(PREFIX.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a landmark index")
+            header = json.loads(f.read(length))
+            if header["people"] != len(graph.person_ids):
+                raise ValueError(f"{path} was built for a different dataset")
+            landmarks = [graph.person_index[person_id] for person_id in header["landmarks"]]
+            distances = []
+            for _ in landmarks:
+                row = array("h")
+                row.fromfile(f, header["people"])
+                distances.append(row)
+        return cls(landmarks, distances)
+
+
+def main():
+    if len(sys.argv) not in (3, 4):
+        sys.exit("Usage: python landmarks.py directory output [k]")
+    k = int(sys.argv[3]) if len(sys.argv) == 4 else 8
+
+    degrees.load_data(sys.argv[1])
+    graph = degrees.graph
+
+    # Kevin Bacon is always a landmark when present
+    include = [graph.person_index[person_id]
+               for person_id in degrees.names.get("kevin bacon", ())]
+    index = LandmarkIndex.build(graph, k, include)
+    index.save(sys.argv[2], graph)
+    print(f"Saved {len(index.landmarks)} landmarks to {sys.argv[2]}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import math
+import unicodedata
+
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain
+
+# Scores by kind of match; fuzzy matches scale their similarity by the last
+EXACT = 1.0
+PREFIX = 0.9
+FUZZY = 0.8
+
+# Fuzzy candidates scored per requested result
+CANDIDATES = 4
+
+
+def normalize(name):
+    """
+    Lowercases a name, strips accents and collapses whitespace.
+    """
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(c for c in name if not unicodedata.combining(c))
+    return " ".join(name.lower().split())
+
+
+def trigrams(text):
+    """
+    Returns the set of padded character trigrams of a normalized name.
+    """
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameIndex():
+    """
+    Sorted normalized names for prefix search, plus a trigram index
+    for typo-tolerant matching.
+    """
+
+    def __init__(self, names):
+        """
+        `names` maps names to collections of person_ids, like `degrees.names`.
+        """
+        merged = {}
+        for name, person_ids in names.items():
+            merged.setdefault(normalize(name), set()).update(person_ids)
+        self.keys = sorted(merged)
+        self.person_ids = [sorted(merged[key]) for key in self.keys]
+
+        postings = {}
+        self.sizes = array("h")
+        for position, key in enumerate(self.keys):
+            grams = trigrams(key)
+            self.sizes.append(len(grams))
+            for gram in grams:
+                postings.setdefault(gram, []).append(position)
+        self.postings = {gram: array("i", positions) for gram, positions in postings.items()}
+
+    def search(self, query, limit=10, threshold=0.5):
+        """
+        Returns up to `limit` (person_id, score) pairs ranked best first:
+        exact matches, then names starting with `query`, then names whose
+        trigram similarity (Dice coefficient) reaches `threshold`.
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        scores = {}
+
+        # Exact and prefix matches are one contiguous run of keys
+        position = bisect_left(self.keys, query)
+        while (position < len(self.keys) and len(scores) < limit
+               and self.keys[position].startswith(query)):
+            scores[position] = EXACT if self.keys[position] == query else PREFIX
+            position += 1
+
+        if len(scores) < limit:
+            scores.update(self.fuzzy(query, threshold, scores, limit))
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], self.keys[item[0]]))
+        results = []
+        for position, score in ranked:
+            for person_id in self.person_ids[position]:
+                results.append((person_id, score))
+        return results[:limit]
+
+    def fuzzy(self, query, threshold, exclude=(), limit=10):
+        """
+        Returns {key position: score} for keys similar to `query`,
+        scoring only the keys sharing the most trigrams with it.
+        """
+        grams = trigrams(query)
+        lists = sorted((self.postings.get(gram, ()) for gram in grams), key=len)
+
+        # Dice >= threshold needs at least `needed` shared trigrams, so
+        # every match is in one of the rarest len(lists) - needed + 1
+        # lists. Count those (Counter runs the loop in C) and only probe
+        # the longest lists for the best candidates.
+        needed = threshold * len(grams) / 2
+        skipped = max(0, math.ceil(needed) - 1)
+        rare = lists[:len(lists) - skipped]
+        common = lists[len(lists) - skipped:]
+        shared = Counter(chain.from_iterable(rare))
+
+        scores = {}
+        for position, count in shared.most_common(CANDIDATES * limit):
+            if position in exclude:
+                continue
+            for positions in common:
+                i = bisect_left(positions, position)
+                if i < len(positions) and positions[i] == position:
+                    count += 1
+            similarity = 2 * count / (len(grams) + self.sizes[position])
+            if similarity >= threshold:
+                scores[position] = FUZZY * similarity
+        return scores
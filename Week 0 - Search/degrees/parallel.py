@@ -0,0 +1,69 @@
+import multiprocessing
+import os
+import time
+
+from concurrent.futures import ProcessPoolExecutor
+
+import degrees
+
+
+def make_pool(workers=None, start=False):
+    """
+    Returns a process pool whose workers share the graph already loaded
+    into `degrees`, or None if this platform cannot fork.
+
+    Workers are forked after `degrees.load_data`, so they see the loaded
+    dicts and adjacency arrays copy-on-write (and a snapshot's mapped
+    pages directly) instead of receiving a pickled copy per task.
+    Call it only after the data is loaded.
+
+    Otherwise workers may be forked on the first tasks. With `start`,
+    every worker is forked before this returns, so none inherits files
+    or sockets opened later, such as a server's connections.
+    """
+    if "fork" not in multiprocessing.get_all_start_methods():
+        return None
+    workers = workers or os.cpu_count()
+    pool = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("fork")
+    )
+    if start:
+        # Tasks that outlast their submission keep idle workers from
+        # taking them all, so each one needs a worker of its own
+        list(pool.map(time.sleep, [0.1] * workers))
+    return pool
+
+
+def paths_for_source(source, targets):
+    """
+    Worker task: one BFS from `source` answering every target.
+    Returns paths in the same order as `targets`.
+    """
+    paths = degrees.shortest_paths_from(source, targets)
+    return [paths[target] for target in targets]
+
+
+def batch_paths(pairs, workers=None):
+    """
+    Parallel version of `degrees.batch_paths`: yields (source, target,
+    path) in the same order, with each source group's BFS run in a
+    worker process. Falls back to running in this process when the
+    platform cannot fork.
+    """
+    targets = {}
+    for source, target in pairs:
+        targets.setdefault(source, []).append(target)
+
+    pool = make_pool(workers)
+    if pool is None:
+        yield from degrees.batch_paths(pairs)
+        return
+
+    with pool:
+        sources = list(targets)
+        results = pool.map(paths_for_source, sources,
+                           [targets[source] for source in sources])
+        for source, paths in zip(sources, results):
+            for target, path in zip(targets[source], paths):
+                yield source, target, path
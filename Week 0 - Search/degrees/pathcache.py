@@ -0,0 +1,92 @@
+import time
+
+from collections import OrderedDict
+
+# Returned by PathCache.get on a miss, since None is a cached answer
+MISS = object()
+
+
+def reverse_path(source, path):
+    """
+    Reverses a (movie_id, person_id) path that starts at `source`,
+    giving the path from its last person back to `source`.
+    """
+    people = [source] + [person_id for _, person_id in path]
+    return [(path[i][0], people[i]) for i in range(len(path) - 1, -1, -1)]
+
+
+class PathCache():
+    """
+    Bounded LRU cache of shortest paths keyed by unordered person pairs,
+    with an optional time-to-live. A path cached for (a, b) also answers
+    (b, a) by reversing it.
+    """
+
+    def __init__(self, maxsize=10000, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, source, target):
+        """
+        Returns the cached path from source to target (possibly None for
+        "not connected"), or MISS.
+        """
+        key = (source, target) if source <= target else (target, source)
+        entry = self.entries.get(key)
+        if entry is None or (self.ttl is not None and entry[1] < time.monotonic()):
+            if entry is not None:
+                del self.entries[key]
+                self.evictions += 1
+            self.misses += 1
+            return MISS
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        path = entry[0]
+        if path is None or source == key[0]:
+            return path
+        return reverse_path(key[0], path)
+
+    def put(self, source, target, path):
+        """
+        Caches the path from source to target, evicting the least
+        recently used entry when full.
+        """
+        if source > target:
+            source, target = target, source
+            if path is not None:
+                path = reverse_path(target, path)
+        expires = None if self.ttl is None else time.monotonic() + self.ttl
+        self.entries[(source, target)] = (path, expires)
+        self.entries.move_to_end((source, target))
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def discard_if(self, test):
+        """
+        Drops the entries for which test(source, target, path) is true.
+        Returns how many were dropped.
+        """
+        stale = [key for key, (path, _) in self.entries.items() if test(key[0], key[1], path)]
+        for key in stale:
+            del self.entries[key]
+        return len(stale)
+
+    def clear(self):
+        """
+        Drops every entry, e.g. after the graph is reloaded.
+        """
+        self.entries.clear()
+
+    def stats(self):
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
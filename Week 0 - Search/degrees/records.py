@@ -0,0 +1,63 @@
+from collections.abc import MutableMapping
+
+
+class Records(MutableMapping):
+    """
+    Maps ids to rows of named fields, like a dict of dicts, but stores
+    one list per field indexed by row number, so a row costs a few list
+    slots rather than a dict of its own.
+
+    `records[id]` builds a {field: value} dict on each access, and
+    assigning such a dict adds or replaces a row. Deleting a row frees
+    its values but not its slots.
+    """
+
+    def __init__(self, *fields):
+        self.fields = fields
+        self.rows = {}
+        self.columns = [[] for _ in fields]
+
+    def add(self, record_id, *values):
+        """
+        Adds or replaces the row for `record_id`, with one value per field.
+        """
+        row = self.rows.get(record_id)
+        if row is None:
+            self.rows[record_id] = len(self.columns[0])
+            for column, value in zip(self.columns, values):
+                column.append(value)
+        else:
+            for column, value in zip(self.columns, values):
+                column[row] = value
+
+    def get_field(self, record_id, field):
+        """
+        Returns one field of a row without building its dict.
+        """
+        return self.columns[self.fields.index(field)][self.rows[record_id]]
+
+    def __getitem__(self, record_id):
+        row = self.rows[record_id]
+        return {field: column[row] for field, column in zip(self.fields, self.columns)}
+
+    def __setitem__(self, record_id, record):
+        self.add(record_id, *(record[field] for field in self.fields))
+
+    def __delitem__(self, record_id):
+        row = self.rows.pop(record_id)
+        for column in self.columns:
+            column[row] = None
+
+    def __contains__(self, record_id):
+        return record_id in self.rows
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def clear(self):
+        self.rows.clear()
+        for column in self.columns:
+            column.clear()
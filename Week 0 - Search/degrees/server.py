@@ -0,0 +1,204 @@
+import asyncio
+import json
+import sys
+import traceback
+
+from urllib.parse import parse_qs, urlsplit
+
+import degrees
+import parallel
+from pathcache import MISS
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           500: "Internal Server Error"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def find_path(source, target):
+    """
+    Worker task: the shortest path between two person_ids.
+    """
+    return degrees.shortest_path(source, target, mode="bidirectional")
+
+
+class Service():
+    """
+    Answers degrees queries over HTTP from the graph loaded at startup.
+    Searches run in `pool` so the event loop keeps serving requests.
+    """
+
+    def __init__(self, pool=None):
+        self.pool = pool
+        self.routes = {
+            "/path": self.path,
+            "/degrees": self.separation,
+            "/search-name": self.search_name,
+            "/cache-stats": self.cache_stats,
+            "/component-size": self.component_size
+        }
+
+    async def handle(self, reader, writer):
+        try:
+            request = await reader.readline()
+            # Drain the headers; requests have no body
+            while (await reader.readline()).strip():
+                pass
+            status, body = await self.respond(request.decode("latin-1"))
+        except HTTPError as e:
+            status, body = e.status, {"error": str(e)}
+        except Exception:
+            # Such as a request line over the stream limit or a dead worker
+            traceback.print_exc()
+            status, body = 500, {"error": "internal error"}
+        payload = json.dumps(body).encode("utf-8")
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(payload)}\r\n"
+            "Connection: close\r\n\r\n".encode("latin-1") + payload
+        )
+        await writer.drain()
+        writer.close()
+
+    async def respond(self, request):
+        try:
+            method, target, _ = request.split()
+        except ValueError:
+            raise HTTPError(400, "malformed request line")
+        if method != "GET":
+            raise HTTPError(405, "only GET is supported")
+        url = urlsplit(target)
+        route = self.routes.get(url.path)
+        if route is None:
+            raise HTTPError(404, f"no such endpoint: {url.path}")
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        return 200, await route(query)
+
+    async def search(self, source, target):
+        path = degrees.path_cache.get(source, target)
+        if path is MISS:
+            loop = asyncio.get_running_loop()
+            path = await loop.run_in_executor(self.pool, find_path, source, target)
+            degrees.path_cache.put(source, target, path)
+        return path
+
+    async def path(self, query):
+        source, target = self.people(query)
+        path = await self.search(source, target)
+        steps = None
+        if path is not None:
+            steps = [{
+                "movie_id": movie_id,
+                "title": degrees.movies[movie_id]["title"],
+                "person_id": person_id,
+                "name": degrees.people[person_id]["name"]
+            } for movie_id, person_id in path]
+        return {
+            "source": source,
+            "target": target,
+            "degrees": None if path is None else len(path),
+            "path": steps
+        }
+
+    async def separation(self, query):
+        source, target = self.people(query)
+
+        # Landmark bounds settle many queries without a search
+        if degrees.landmark_index is not None:
+            bounds = degrees.degrees_of_separation(source, target)
+            if bounds is None or bounds[0] == bounds[1]:
+                return {
+                    "source": source,
+                    "target": target,
+                    "degrees": None if bounds is None else bounds[0]
+                }
+
+        path = await self.search(source, target)
+        return {
+            "source": source,
+            "target": target,
+            "degrees": None if path is None else len(path)
+        }
+
+    async def search_name(self, query):
+        if "q" not in query:
+            raise HTTPError(400, "missing parameter: q")
+        try:
+            limit = int(query.get("limit", 10))
+        except ValueError:
+            raise HTTPError(400, "limit must be an integer")
+        return {
+            "results": [{
+                "person_id": person_id,
+                "name": degrees.people[person_id]["name"],
+                "birth": degrees.people[person_id]["birth"],
+                "score": score
+            } for person_id, score in degrees.search_names(query["q"], limit)]
+        }
+
+    async def component_size(self, query):
+        if "person" not in query:
+            raise HTTPError(400, "missing parameter: person")
+        person_id = degrees.resolve_person(query["person"])
+        if person_id is None:
+            raise HTTPError(404, f"person not found or ambiguous: {query['person']}")
+        return {"person_id": person_id, "component_size": degrees.component_size(person_id)}
+
+    async def cache_stats(self, query):
+        return degrees.path_cache.stats()
+
+    def people(self, query):
+        """
+        Resolves the `source` and `target` parameters to person_ids.
+        """
+        resolved = []
+        for key in ("source", "target"):
+            if key not in query:
+                raise HTTPError(400, f"missing parameter: {key}")
+            person_id = degrees.resolve_person(query[key])
+            if person_id is None:
+                raise HTTPError(404, f"person not found or ambiguous: {query[key]}")
+            resolved.append(person_id)
+        return resolved
+
+
+async def serve(port, pool=None):
+    service = Service(pool)
+    server = await asyncio.start_server(service.handle, "127.0.0.1", port)
+    print(f"Serving on http://127.0.0.1:{port}")
+    async with server:
+        await server.serve_forever()
+
+
+def main():
+    if len(sys.argv) not in (2, 3, 4, 5):
+        sys.exit("Usage: python server.py directory [port] [workers] [landmarks]")
+    port = int(sys.argv[2]) if len(sys.argv) >= 3 else 8000
+    workers = int(sys.argv[3]) if len(sys.argv) >= 4 else None
+
+    print("Loading data...")
+    degrees.load_data(sys.argv[1])
+    degrees.build_components()
+    # A landmark index (see landmarks.py) lets /degrees skip searches
+    if len(sys.argv) == 5:
+        degrees.load_landmarks(sys.argv[4])
+    # Build the name index now so forked workers never rebuild it
+    degrees.search_names("")
+    print("Data loaded.")
+
+    # Fork every worker now, before any socket exists for them to inherit
+    pool = parallel.make_pool(workers, start=True)
+    try:
+        asyncio.run(serve(port, pool))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
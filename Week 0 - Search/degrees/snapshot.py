@@ -0,0 +1,107 @@
+import json
+import mmap
+import os
+import struct
+import sys
+
+from array import array
+
+from graph import Graph
+
+# Bump whenever the layout below changes
+VERSION = 2
+MAGIC = b"DEGSNAP\0"
+FILENAME = "degrees.snapshot"
+SOURCES = ("people.csv", "movies.csv", "stars.csv")
+ARRAYS = ("person_offsets", "person_movies", "movie_offsets", "movie_people")
+
+# Magic, version, header length
+PREFIX = struct.Struct("<8sII")
+
+
+def source_stats(directory):
+    """
+    Returns {filename: [mtime_ns, size]} for the CSV files a snapshot
+    is built from.
+    """
+    stats = {}
+    for filename in SOURCES:
+        stat = os.stat(f"{directory}/{filename}")
+        stats[filename] = [stat.st_mtime_ns, stat.st_size]
+    return stats
+
+
+def write(path, sources, prune, stats, people, movies, graph):
+    """
+    Writes people, movies, the graph's adjacency arrays and the load
+    statistics to `path`.
+    The file is replaced atomically so readers never see half of it.
+    """
+    header = {
+        "sources": sources,
+        "prune": prune,
+        "stats": stats,
+        "byteorder": sys.byteorder,
+        "people": [[person_id, person["name"], person["birth"]]
+                   for person_id, person in people.items()],
+        "movies": [[movie_id, movie["title"], movie["year"]]
+                   for movie_id, movie in movies.items()],
+        "arrays": [len(getattr(graph, name)) for name in ARRAYS]
+    }
+    header = json.dumps(header, separators=(",", ":")).encode("utf-8")
+
+    # Pad so the int arrays start 4-byte aligned
+    header += b" " * (-(PREFIX.size + len(header)) % 4)
+
+    temp = f"{path}.{os.getpid()}.tmp"
+    with open(temp, "wb") as f:
+        f.write(PREFIX.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for name in ARRAYS:
+            f.write(array("i", getattr(graph, name)).tobytes())
+    os.replace(temp, path)
+
+
+def read(path, sources, prune):
+    """
+    Memory-maps the snapshot at `path`.
+
+    Returns (people rows, movie rows, graph, stats), or None if there is
+    no snapshot, it is damaged or truncated, or it was built from
+    different CSV files, with another `prune` setting or in another
+    layout.
+    """
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        magic, version, length = PREFIX.unpack_from(buffer)
+    except struct.error:
+        return None
+    if magic != MAGIC or version != VERSION:
+        return None
+    try:
+        header = json.loads(buffer[PREFIX.size:PREFIX.size + length])
+    except ValueError:
+        return None
+    if (header["sources"] != sources or header["prune"] != prune
+            or header["byteorder"] != sys.byteorder):
+        return None
+
+    # Slice the adjacency arrays straight out of the mapping
+    view = memoryview(buffer)
+    offset = PREFIX.size + length
+    arrays = []
+    for size in header["arrays"]:
+        if offset + 4 * size > len(buffer):
+            return None
+        arrays.append(view[offset:offset + 4 * size].cast("i"))
+        offset += 4 * size
+
+    person_ids = [row[0] for row in header["people"]]
+    movie_ids = [row[0] for row in header["movies"]]
+    graph = Graph(person_ids, movie_ids, *arrays)
+    return header["people"], header["movies"], graph, header["stats"]
@@ -1,19 +1,125 @@
+import json
+import time
+import tracemalloc
+
+from collections import deque
+from contextlib import contextmanager
+
+
 class Node():
+    __slots__ = ("state", "parent", "action")
+
     def __init__(self, state, parent, action):
         self.state = state
         self.parent = parent
         self.action = action
 
 
+def escape_label(value):
+    """
+    Escapes a Prometheus label value: backslash, double quote and newline.
+    """
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class SearchStats():
+    """
+    Counters and timings for one search: nodes expanded and generated,
+    peak frontier size, explored-set size, seconds per phase and,
+    optionally, peak bytes allocated (via tracemalloc).
+
+    Searches only touch it when one is passed in, so leaving it out
+    costs nothing.
+    """
+
+    def __init__(self, trace_allocations=False):
+        self.expanded = 0
+        self.generated = 0
+        self.peak_frontier = 0
+        self.explored = 0
+        self.phases = {}
+        self.trace_allocations = trace_allocations
+        self.peak_allocated = None
+
+    def frontier_size(self, size):
+        if size > self.peak_frontier:
+            self.peak_frontier = size
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Times the enclosed block as phase `name`, tracing allocations
+        too when enabled.
+        """
+        tracing = self.trace_allocations and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.phases[name] = self.phases.get(name, 0) + time.perf_counter() - start
+            if tracing:
+                peak = tracemalloc.get_traced_memory()[1]
+                self.peak_allocated = max(self.peak_allocated or 0, peak)
+                tracemalloc.stop()
+
+    def as_dict(self):
+        return {
+            "nodes_expanded": self.expanded,
+            "nodes_generated": self.generated,
+            "peak_frontier": self.peak_frontier,
+            "explored": self.explored,
+            "phase_seconds": dict(self.phases),
+            "peak_allocated_bytes": self.peak_allocated
+        }
+
+    def to_json(self):
+        return json.dumps(self.as_dict())
+
+    def to_prometheus(self, prefix="search", labels=None):
+        """
+        Returns the stats in the Prometheus text exposition format.
+        """
+        labels = dict(labels or {})
+
+        def sample(name, value, extra=None):
+            pairs = {**labels, **(extra or {})}
+            text = ",".join(f'{key}="{escape_label(value)}"' for key, value in pairs.items())
+            return f"{prefix}_{name}{{{text}}} {value}" if text else f"{prefix}_{name} {value}"
+
+        lines = []
+        for name, kind, value in (("nodes_expanded_total", "counter", self.expanded),
+                                  ("nodes_generated_total", "counter", self.generated),
+                                  ("peak_frontier", "gauge", self.peak_frontier),
+                                  ("explored", "gauge", self.explored)):
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            lines.append(sample(name, value))
+        lines.append(f"# TYPE {prefix}_phase_seconds gauge")
+        for phase, seconds in self.phases.items():
+            lines.append(sample("phase_seconds", seconds, {"phase": phase}))
+        if self.peak_allocated is not None:
+            lines.append(f"# TYPE {prefix}_peak_allocated_bytes gauge")
+            lines.append(sample("peak_allocated_bytes", self.peak_allocated))
+        return "\n".join(lines) + "\n"
+
+
 class StackFrontier():
-    def __init__(self):
-        self.frontier = []
+    def __init__(self, stats=None):
+        self.frontier = deque()
+        # Number of frontier nodes holding each state
+        self.states = {}
+        self.stats = stats
 
     def add(self, node):
         self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+        if self.stats is not None:
+            self.stats.generated += 1
+            self.stats.frontier_size(len(self.frontier))
 
     def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+        return state in self.states
 
     def empty(self):
         return len(self.frontier) == 0
@@ -22,10 +128,19 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
+            node = self.frontier.pop()
+            self.discard(node.state)
+            if self.stats is not None:
+                self.stats.expanded += 1
             return node
 
+    def discard(self, state):
+        count = self.states[state] - 1
+        if count:
+            self.states[state] = count
+        else:
+            del self.states[state]
+
 
 class QueueFrontier(StackFrontier):
 
@@ -33,6 +148,8 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
+            node = self.frontier.popleft()
+            self.discard(node.state)
+            if self.stats is not None:
+                self.stats.expanded += 1
             return node
@@ -1,21 +1,117 @@
+import gzip
+import heapq
+import json
+import mmap
+import os
 import sys
-
-class Node():
-    def __init__(self, state, parent, action):
-        self.state = state
-        self.parent = parent
-        self.action = action
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+
+def escape_label(value):
+    """
+    Escapes a Prometheus label value: backslash, double quote and newline.
+    """
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class SearchStats():
+    """
+    Counters and timings for one search: nodes expanded and generated,
+    peak frontier size, explored-set size, seconds per phase and,
+    optionally, peak bytes allocated (via tracemalloc).
+
+    Searches only touch it when one is passed in, so leaving it out
+    costs nothing.
+    """
+
+    def __init__(self, trace_allocations=False):
+        self.expanded = 0
+        self.generated = 0
+        self.peak_frontier = 0
+        self.explored = 0
+        self.phases = {}
+        self.trace_allocations = trace_allocations
+        self.peak_allocated = None
+
+    def frontier_size(self, size):
+        if size > self.peak_frontier:
+            self.peak_frontier = size
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Times the enclosed block as phase `name`, tracing allocations
+        too when enabled.
+        """
+        tracing = self.trace_allocations and not tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.phases[name] = self.phases.get(name, 0) + time.perf_counter() - start
+            if tracing:
+                peak = tracemalloc.get_traced_memory()[1]
+                self.peak_allocated = max(self.peak_allocated or 0, peak)
+                tracemalloc.stop()
+
+    def as_dict(self):
+        return {
+            "nodes_expanded": self.expanded,
+            "nodes_generated": self.generated,
+            "peak_frontier": self.peak_frontier,
+            "explored": self.explored,
+            "phase_seconds": dict(self.phases),
+            "peak_allocated_bytes": self.peak_allocated
+        }
+
+    def to_json(self):
+        return json.dumps(self.as_dict())
+
+    def to_prometheus(self, prefix="search", labels=None):
+        """
+        Returns the stats in the Prometheus text exposition format.
+        """
+        labels = dict(labels or {})
+
+        def sample(name, value, extra=None):
+            pairs = {**labels, **(extra or {})}
+            text = ",".join(f'{key}="{escape_label(value)}"' for key, value in pairs.items())
+            return f"{prefix}_{name}{{{text}}} {value}" if text else f"{prefix}_{name} {value}"
+
+        lines = []
+        for name, kind, value in (("nodes_expanded_total", "counter", self.expanded),
+                                  ("nodes_generated_total", "counter", self.generated),
+                                  ("peak_frontier", "gauge", self.peak_frontier),
+                                  ("explored", "gauge", self.explored)):
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            lines.append(sample(name, value))
+        lines.append(f"# TYPE {prefix}_phase_seconds gauge")
+        for phase, seconds in self.phases.items():
+            lines.append(sample("phase_seconds", seconds, {"phase": phase}))
+        if self.peak_allocated is not None:
+            lines.append(f"# TYPE {prefix}_peak_allocated_bytes gauge")
+            lines.append(sample("peak_allocated_bytes", self.peak_allocated))
+        return "\n".join(lines) + "\n"
 
 
 class StackFrontier():
-    def __init__(self):
-        self.frontier = []
+    """
+    Frontier of flat cell indices, removed last in, first out.
+    """
 
-    def add(self, node):
-        self.frontier.append(node)
+    def __init__(self, stats=None):
+        self.frontier = deque()
+        self.stats = stats
 
-    def contains_state(self, state):
-        return any(node.state == state for node in self.frontier)
+    def add(self, state):
+        self.frontier.append(state)
+        if self.stats is not None:
+            self.stats.generated += 1
+            self.stats.frontier_size(len(self.frontier))
 
     def empty(self):
         return len(self.frontier) == 0
@@ -24,9 +120,10 @@ class StackFrontier():
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[-1]
-            self.frontier = self.frontier[:-1]
-            return node
+            state = self.frontier.pop()
+            if self.stats is not None:
+                self.stats.expanded += 1
+            return state
 
 
 class QueueFrontier(StackFrontier):
@@ -35,194 +132,517 @@ class QueueFrontier(StackFrontier):
         if self.empty():
             raise Exception("empty frontier")
         else:
-            node = self.frontier[0]
-            self.frontier = self.frontier[1:]
-            return node
+            state = self.frontier.popleft()
+            if self.stats is not None:
+                self.stats.expanded += 1
+            return state
+
+
+# Marks a PriorityFrontier entry replaced by a lower priority one
+STALE = -1
+
+
+class PriorityFrontier():
+    """
+    Frontier that removes the state with the lowest priority first,
+    along with the path cost it was added with.
+
+    Adding a state that is already in the frontier with a lower priority
+    replaces it (decrease-key): the old heap entry is marked stale and
+    skipped when it reaches the top.
+    """
+
+    def __init__(self, stats=None):
+        self.heap = []
+        # Live [priority, order, state, cost] entry for each state
+        self.entries = {}
+        self.order = 0
+        self.stats = stats
+
+    def add(self, state, priority, cost=0):
+        """
+        Adds the state, or lowers its priority. Returns False if it was
+        already in the frontier with the same or a lower priority.
+        """
+        entry = self.entries.get(state)
+        if entry is not None:
+            if entry[0] <= priority:
+                return False
+            entry[2] = STALE
+        entry = [priority, self.order, state, cost]
+        self.order += 1
+        self.entries[state] = entry
+        heapq.heappush(self.heap, entry)
+        if self.stats is not None:
+            self.stats.generated += 1
+            self.stats.frontier_size(len(self.entries))
+        return True
+
+    def contains_state(self, state):
+        return state in self.entries
+
+    def priority(self, state):
+        return self.entries[state][0]
+
+    def empty(self):
+        return len(self.entries) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        while True:
+            _, _, state, cost = heapq.heappop(self.heap)
+            if state != STALE:
+                break
+        del self.entries[state]
+        if self.stats is not None:
+            self.stats.expanded += 1
+        return state, cost
+
+
+# Tables for bytes.translate from maze file characters to wall flags
+# and to the cost of entering the cell
+DIGITS = b"123456789"
+WALLS = bytes(0 if byte in b" AB" + DIGITS else 1 for byte in range(256))
+COSTS = bytes(byte - ord("0") if byte in DIGITS else 1 for byte in range(256))
+
+
+def maze_lines(filename):
+    """
+    Yields each line of a maze file as bytes, without its line ending.
+    Plain files are memory-mapped; names ending in .gz are decompressed
+    as a stream. Non-ASCII characters become "?", which reads as a wall.
+    """
+    if str(filename).endswith(".gz"):
+        with gzip.open(filename, "rb") as f:
+            for line in f:
+                yield ascii_line(line.rstrip(b"\r\n"))
+        return
+
+    with open(filename, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            start = 0
+            while start < len(data):
+                end = data.find(b"\n", start)
+                if end == -1:
+                    end = len(data)
+                yield ascii_line(data[start:end].rstrip(b"\r"))
+                start = end + 1
+
+
+def ascii_line(line):
+    if line.isascii():
+        return line
+    return line.decode("utf-8", "replace").encode("ascii", "replace")
+
+
+# Palette indices and colors for output_image
+EMPTY_COLOR, WALL_COLOR, EXPLORED_COLOR, SOLUTION_COLOR, START_COLOR, GOAL_COLOR, BORDER_COLOR = range(7)
+PALETTE = [(237, 240, 252), (40, 40, 40), (212, 97, 85), (220, 235, 113),
+           (255, 0, 0), (0, 171, 28), (0, 0, 0)]
+WALL_COLORS = bytes([EMPTY_COLOR, WALL_COLOR]) + bytes(254)
+EXPLORED_COLORS = bytes([EMPTY_COLOR, EXPLORED_COLOR]) + bytes(254)
+
+# output_image shrinks cells so the image's longer side fits this
+MAX_IMAGE_SIDE = 4000
+
+
+# Strategies accepted by Maze.solve
+STRATEGIES = ("dfs", "bfs", "greedy", "astar", "dijkstra", "wavefront")
+
+# Moves in the order neighbors tries them, and the byte code recording
+# each one in a solve's parent table (0 is "not reached yet")
+ACTIONS = ("up", "down", "left", "right")
+CODES = {action: code for code, action in enumerate(ACTIONS, 1)}
+START = len(ACTIONS) + 1
+
 
 class Maze():
+    """
+    A maze read from a text file, optionally gzip-compressed (.gz):
+    spaces are open, A is the start, B the goal, a digit an open cell
+    that costs that much to enter, and anything else a wall.
+
+    Cells are stored row by row and searched by flat index
+    (row * width + col): walls, weighted-cell costs and the explored
+    flags are each one byte per cell, so memory stays a few bytes per
+    cell however large the maze.
+    """
 
     def __init__(self, filename):
 
-        # Read file and set height and width of maze
-        with open(filename) as f:
-            contents = f.read()
+        # Determine height and width of maze
+        self.height = 0
+        self.width = 0
+        for line in maze_lines(filename):
+            self.height += 1
+            self.width = max(self.width, len(line))
+
+        # Keep track of walls, and of the cost of entering each cell if
+        # any is weighted; cells past the end of a short line are open
+        self.walls = bytearray(self.height * self.width)
+        self.costs = None
+        starts = goals = 0
+        for i, line in enumerate(maze_lines(filename)):
+            offset = i * self.width
+            self.walls[offset:offset + len(line)] = line.translate(WALLS)
+            if len(line.translate(None, DIGITS)) != len(line):
+                if self.costs is None:
+                    self.costs = bytearray(b"\x01") * len(self.walls)
+                self.costs[offset:offset + len(line)] = line.translate(COSTS)
+            if b"A" in line:
+                starts += line.count(b"A")
+                self.start = (i, line.index(b"A"))
+            if b"B" in line:
+                goals += line.count(b"B")
+                self.goal = (i, line.index(b"B"))
 
         # Validate start and goal
-        if contents.count("A") != 1:
+        if starts != 1:
             raise Exception("maze must have exactly one start point")
-        if contents.count("B") != 1:
+        if goals != 1:
             raise Exception("maze must have exactly one goal")
 
-        # Determine height and width of maze
-        contents = contents.splitlines()
-        self.height = len(contents)
-        self.width = max(len(line) for line in contents)
+        self.solution = None
+        self.explored = None
 
-        # Keep track of walls
-        self.walls = []
-        for i in range(self.height):
-            row = []
-            for j in range(self.width):
-                try:
-                    if contents[i][j] == "A":
-                        self.start = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == "B":
-                        self.goal = (i, j)
-                        row.append(False)
-                    elif contents[i][j] == " ":
-                        row.append(False)
-                    else:
-                        row.append(True)
-                except IndexError:
-                    row.append(False)
-            self.walls.append(row)
 
-        self.solution = None
+    def index(self, state):
+        return state[0] * self.width + state[1]
+
+
+    def cell(self, index):
+        return divmod(index, self.width)
+
+
+    def solution_indices(self):
+        if self.solution is None:
+            return set()
+        return {self.index(cell) for cell in self.solution[1]}
 
 
     def print(self):
-        solution = self.solution[1] if self.solution is not None else None
+        solution = self.solution_indices()
+        start = self.index(self.start)
+        goal = self.index(self.goal)
         print()
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-                if col:
-                    print("█", end="")
-                elif (i, j) == self.start:
-                    print("A", end="")
-                elif (i, j) == self.goal:
-                    print("B", end="")
-                elif solution is not None and (i, j) in solution:
-                    print("*", end="")
+        for i in range(self.height):
+            row = []
+            for index in range(i * self.width, (i + 1) * self.width):
+                if self.walls[index]:
+                    row.append("█")
+                elif index == start:
+                    row.append("A")
+                elif index == goal:
+                    row.append("B")
+                elif index in solution:
+                    row.append("*")
+                elif self.costs is not None and self.costs[index] > 1:
+                    row.append(str(self.costs[index]))
                 else:
-                    print(" ", end="")
-            print()
+                    row.append(" ")
+            print("".join(row))
         print()
 
 
-    def neighbors(self, state):
-        row, col = state
-        candidates = [
-            ("up", (row - 1, col)),
-            ("down", (row + 1, col)),
-            ("left", (row, col - 1)),
-            ("right", (row, col + 1))
-        ]
-
+    def neighbors(self, index):
+        """
+        Returns (action, index) for each open cell next to `index`.
+        """
+        width = self.width
+        walls = self.walls
+        row, col = divmod(index, width)
         result = []
-        for action, (r, c) in candidates:
-            if 0 <= r < self.height and 0 <= c < self.width and not self.walls[r][c]:
-                result.append((action, (r, c)))
+        if row > 0 and not walls[index - width]:
+            result.append(("up", index - width))
+        if row < self.height - 1 and not walls[index + width]:
+            result.append(("down", index + width))
+        if col > 0 and not walls[index - 1]:
+            result.append(("left", index - 1))
+        if col < width - 1 and not walls[index + 1]:
+            result.append(("right", index + 1))
         return result
 
 
-    def solve(self):
-        """Finds a solution to maze, if one exists."""
+    def cost(self, index):
+        """
+        Returns the cost of stepping into the cell at `index`: its digit
+        for weighted cells, otherwise 1.
+        """
+        return 1 if self.costs is None else self.costs[index]
+
+
+    def heuristic(self, index):
+        """
+        Returns the Manhattan distance from `index` to the goal. Every
+        step costs at least 1, so it never overestimates.
+        """
+        row, col = divmod(index, self.width)
+        return abs(row - self.goal[0]) + abs(col - self.goal[1])
+
+
+    def solve(self, strategy="dfs", stats=None):
+        """
+        Finds a solution to maze, if one exists, using one of STRATEGIES:
+        depth-first, breadth-first, greedy best-first (by the heuristic),
+        A* (cost so far plus heuristic), Dijkstra (cost so far) or a
+        wavefront from the goal (see distance_field, needs NumPy).
+        Only A* and Dijkstra find the cheapest path through weighted cells.
+        Pass a SearchStats as `stats` to record what the search did.
+
+        Afterwards `explored` has a nonzero byte for each explored cell.
+        """
+        if strategy not in STRATEGIES:
+            raise ValueError(f"unknown strategy {strategy!r}")
+        if strategy == "wavefront":
+            return self.solve_wavefront(stats)
 
         # Keep track of number of states explored
         self.num_explored = 0
+        self.explored = bytearray(len(self.walls))
+
+        # Code of the action that first reached each cell
+        parents = bytearray(len(self.walls))
+        start = self.index(self.start)
+        parents[start] = START
+
+        if strategy not in ("dfs", "bfs"):
+            return self.solve_best_first(start, parents, strategy, stats)
 
         # Initialize frontier to just the starting position
-        start = Node(state=self.start, parent=None, action=None)
-        frontier = StackFrontier()
+        frontier = StackFrontier(stats) if strategy == "dfs" else QueueFrontier(stats)
         frontier.add(start)
-
-        # Initialize an empty explored set
-        self.explored = set()
+        goal = self.index(self.goal)
 
         # Keep looping until solution found
         while True:
 
             # If nothing left in frontier, then no path
             if frontier.empty():
+                if stats is not None:
+                    stats.explored = self.num_explored
                 raise Exception("no solution")
 
-            # Choose a node from the frontier
-            node = frontier.remove()
+            # Choose a cell from the frontier
+            index = frontier.remove()
             self.num_explored += 1
 
-            # If node is the goal, then we have a solution
-            if node.state == self.goal:
-                actions = []
-                cells = []
-                while node.parent is not None:
-                    actions.append(node.action)
-                    cells.append(node.state)
-                    node = node.parent
-                actions.reverse()
-                cells.reverse()
-                self.solution = (actions, cells)
+            # If it is the goal, then we have a solution
+            if index == goal:
+                if stats is not None:
+                    stats.explored = self.num_explored - 1
+                self.solution = self.trace(parents, index)
                 return
 
-            # Mark node as explored
-            self.explored.add(node.state)
+            # Mark cell as explored
+            self.explored[index] = 1
 
-            # Add neighbors to frontier
-            for action, state in self.neighbors(node.state):
-                if not frontier.contains_state(state) and state not in self.explored:
-                    child = Node(state=state, parent=node, action=action)
-                    frontier.add(child)
+            # Add neighbors never reached before to frontier
+            for action, neighbor in self.neighbors(index):
+                if not parents[neighbor]:
+                    parents[neighbor] = CODES[action]
+                    frontier.add(neighbor)
 
 
-    def output_image(self, filename, show_solution=True, show_explored=False):
-        from PIL import Image, ImageDraw
-        cell_size = 50
-        cell_border = 2
-
-        # Create a blank canvas
-        img = Image.new(
-            "RGBA",
-            (self.width * cell_size, self.height * cell_size),
-            "black"
-        )
-        draw = ImageDraw.Draw(img)
-
-        solution = self.solution[1] if self.solution is not None else None
-        for i, row in enumerate(self.walls):
-            for j, col in enumerate(row):
-
-                # Walls
-                if col:
-                    fill = (40, 40, 40)
-
-                # Start
-                elif (i, j) == self.start:
-                    fill = (255, 0, 0)
-
-                # Goal
-                elif (i, j) == self.goal:
-                    fill = (0, 171, 28)
-
-                # Solution
-                elif solution is not None and show_solution and (i, j) in solution:
-                    fill = (220, 235, 113)
-
-                # Explored
-                elif solution is not None and show_explored and (i, j) in self.explored:
-                    fill = (212, 97, 85)
-
-                # Empty cell
-                else:
-                    fill = (237, 240, 252)
+    def solve_best_first(self, start, parents, strategy, stats=None):
+        """
+        The greedy, astar and dijkstra strategies of solve: expands the
+        frontier cell with the lowest priority, lowering the priority of
+        frontier cells when a cheaper path to them turns up.
+        """
+        frontier = PriorityFrontier(stats)
+        frontier.add(start, 0)
+        goal = self.index(self.goal)
+
+        while True:
+            if frontier.empty():
+                if stats is not None:
+                    stats.explored = self.num_explored
+                raise Exception("no solution")
+
+            index, cost = frontier.remove()
+            self.num_explored += 1
+
+            if index == goal:
+                if stats is not None:
+                    stats.explored = self.num_explored - 1
+                self.solution = self.trace(parents, index)
+                return
 
-                # Draw cell
-                draw.rectangle(
-                    ([(j * cell_size + cell_border, i * cell_size + cell_border),
-                      ((j + 1) * cell_size - cell_border, (i + 1) * cell_size - cell_border)]),
-                    fill=fill
-                )
+            self.explored[index] = 1
+
+            for action, neighbor in self.neighbors(index):
+                if self.explored[neighbor]:
+                    continue
+                total = cost + self.cost(neighbor)
+                if strategy == "greedy":
+                    priority = self.heuristic(neighbor)
+                elif strategy == "astar":
+                    priority = total + self.heuristic(neighbor)
+                else:
+                    priority = total
+                if frontier.add(neighbor, priority, total):
+                    parents[neighbor] = CODES[action]
+
+
+    def trace(self, parents, index):
+        """
+        Returns the (actions, cells) that lead from the start to `index`,
+        following the action codes in `parents` back to the start.
+        """
+        offsets = (-self.width, self.width, -1, 1)
+        actions = []
+        cells = []
+        while parents[index] != START:
+            code = parents[index] - 1
+            actions.append(ACTIONS[code])
+            cells.append(self.cell(index))
+            index -= offsets[code]
+        actions.reverse()
+        cells.reverse()
+        return actions, cells
+
+
+    def distance_field(self):
+        """
+        Returns a (height, width) NumPy int32 array of the number of steps
+        from each cell to the goal, with -1 for walls and cells that cannot
+        reach it. Weighted cells count as one step.
+
+        A breadth-first wavefront from the goal: each step shifts the whole
+        frontier's flat indices by the four neighbor offsets at once and
+        keeps those that land on open, unvisited cells of a boolean mask.
+        The grid is padded with walls so the offsets never wrap a row.
+        Each step costs a few NumPy calls, so it pays off most when the
+        frontier is wide (open areas), less in long one-cell corridors.
+        """
+        import numpy as np
+
+        width = self.width + 2
+        walls = np.ones((self.height + 2, width), dtype=bool)
+        walls[1:-1, 1:-1] = np.frombuffer(self.walls, dtype=np.uint8).reshape(
+            self.height, self.width).astype(bool)
+        unvisited = ~walls.ravel()
+        distances = np.full(unvisited.size, -1, dtype=np.int32)
+
+        offsets = np.array([-width, width, -1, 1])
+        frontier = np.array([(self.goal[0] + 1) * width + self.goal[1] + 1])
+        unvisited[frontier] = False
+        distances[frontier] = 0
+        step = 0
+        while frontier.size:
+            step += 1
+            candidates = (frontier[:, None] + offsets).ravel()
+            candidates = candidates[unvisited[candidates]]
+
+            # Keep one copy of each cell: the one whose write to distances stuck
+            order = np.arange(candidates.size, dtype=np.int32)
+            distances[candidates] = order
+            frontier = candidates[distances[candidates] == order]
+            unvisited[frontier] = False
+            distances[frontier] = step
+        return distances.reshape(self.height + 2, width)[1:-1, 1:-1].copy()
+
+
+    def field_path(self, field, start=None):
+        """
+        Returns the (actions, cells) of a shortest path from `start`
+        (default the maze's start) to the goal, stepping downhill
+        through a distance_field.
+        """
+        row, col = self.start if start is None else start
+        if field[row, col] < 0:
+            raise Exception("no solution")
+        moves = (("up", -1, 0), ("down", 1, 0), ("left", 0, -1), ("right", 0, 1))
+        actions = []
+        cells = []
+        while field[row, col] > 0:
+            for action, dr, dc in moves:
+                r, c = row + dr, col + dc
+                if (0 <= r < self.height and 0 <= c < self.width
+                        and field[r, c] == field[row, col] - 1):
+                    break
+            actions.append(action)
+            cells.append((r, c))
+            row, col = r, c
+        return actions, cells
+
+
+    def solve_wavefront(self, stats=None):
+        """
+        The wavefront strategy of solve: builds the whole distance_field,
+        then walks down it from the start. Every cell that can reach the
+        goal counts as explored.
+        """
+        field = self.distance_field()
+        self.solution = self.field_path(field)
+        reached = (field >= 0).ravel()
+        self.explored = bytearray(reached.astype("uint8").tobytes())
+        self.num_explored = int(reached.sum())
+        if stats is not None:
+            stats.expanded = stats.generated = stats.explored = self.num_explored
+
+
+    def output_image(self, filename, show_solution=True, show_explored=False, cell_size=None):
+        """
+        Draws the maze to `filename`, `cell_size` pixels per cell. By
+        default that is 50, less for mazes too big to fit MAX_IMAGE_SIDE,
+        down to one pixel per cell.
+
+        Colors one palette index per cell, scales that up with
+        nearest-neighbor resampling, then draws the black lines between
+        cells as one rectangle per row and column of cells.
+        """
+        from PIL import Image, ImageDraw
+        if cell_size is None:
+            cell_size = max(1, min(50, MAX_IMAGE_SIDE // max(self.width, self.height, 1)))
+        cell_border = 2 if cell_size >= 10 else 1 if cell_size >= 4 else 0
+
+        # Walls and empty cells, with explored cells ORed in as one big
+        # int each (EMPTY_COLOR is 0, and walls are never explored)
+        colors = self.walls.translate(WALL_COLORS)
+        if self.solution is not None and show_explored:
+            explored = self.explored.translate(EXPLORED_COLORS)
+            colors = (int.from_bytes(colors, "big") | int.from_bytes(explored, "big")).to_bytes(
+                len(colors), "big")
+        colors = bytearray(colors)
+
+        # Solution, then start and goal over it
+        if self.solution is not None and show_solution:
+            for row, col in self.solution[1]:
+                colors[row * self.width + col] = SOLUTION_COLOR
+        colors[self.index(self.start)] = START_COLOR
+        colors[self.index(self.goal)] = GOAL_COLOR
+
+        img = Image.frombytes("P", (self.width, self.height), bytes(colors))
+        img.putpalette([value for color in PALETTE for value in color])
+        img = img.resize((self.width * cell_size, self.height * cell_size), Image.NEAREST)
+
+        # Each cell keeps cell_border pixels of black on every side
+        if cell_border:
+            draw = ImageDraw.Draw(img)
+            for j in range(self.width + 1):
+                x = j * cell_size
+                draw.rectangle([(x - cell_border + 1, 0), (x + cell_border - 1, img.height - 1)],
+                               fill=BORDER_COLOR)
+            for i in range(self.height + 1):
+                y = i * cell_size
+                draw.rectangle([(0, y - cell_border + 1), (img.width - 1, y + cell_border - 1)],
+                               fill=BORDER_COLOR)
 
         img.save(filename)
 
 
-if len(sys.argv) != 2:
-    sys.exit("Usage: python maze.py maze.txt")
+if len(sys.argv) not in (2, 3) or (len(sys.argv) == 3 and sys.argv[2] not in STRATEGIES):
+    sys.exit(f"Usage: python maze.py maze.txt [{'|'.join(STRATEGIES)}]")
 
 m = Maze(sys.argv[1])
 print("Maze:")
 m.print()
 print("Solving...")
-m.solve()
+m.solve(sys.argv[2] if len(sys.argv) == 3 else "dfs")
 print("States Explored:", m.num_explored)
 print("Solution:")
 m.print()